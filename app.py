@@ -8,10 +8,12 @@ import pandas as pd
 import streamlit as st
 
 from backend.feeds import ALL_FEEDS
-from backend.search import search_multi_source
+from backend.search import search_multi_source_stream
 from backend.filters import is_west_java_hit
+from backend.feedhealth import feed_health_stats
 from backend.extract import fetch_articles
-from backend.sentiment import load_models, batch_sentiment
+from backend.jobs import job_id_for, job_progress
+from backend.sentiment import load_models, clustered_sentiment
 
 st.set_page_config(page_title="Sentimen Berita Indonesia", page_icon="📰", layout="wide")
 st.title("📰 Analisis Sentimen Berita Indonesia")
@@ -36,13 +38,16 @@ with st.form("search_form", clear_on_submit=False):
     with col5:
         lock_jabar = st.checkbox("🔒 Khusus Jabar", value=False)
     # app.py – di dalam st.form("search_form")
-    col6, col7 = st.columns([1, 1])
+    col6, col7, col8 = st.columns([1, 1, 1])
     with col6:
         use_gnews = st.checkbox("➕ Tambahkan Google News", value=True,
                                 help="Ambil juga hasil dari Google News RSS (disaring ke media Indonesia).")
     with col7:
         use_bm25 = st.checkbox("🎯 Rerank BM25", value=True,
                                help="Urutkan hasil paling relevan sebelum ekstraksi.")
+    with col8:
+        use_live = st.checkbox("🌐 Refresh live", value=True,
+                               help="Matikan untuk menjawab langsung dari indeks lokal (tanpa crawl).")
 
 
     user_agent = st.text_input("Custom User-Agent (opsional)", value="")
@@ -63,17 +68,39 @@ if end_date and start_date and end_date < start_date:
     st.stop()
 
 # ---------- CRAWL / SEARCH ----------
-with st.status("🔎 Mengumpulkan RSS media lokal...", expanded=False) as status:
-    rows = search_multi_source(
+with st.status("🔎 Mengumpulkan RSS media lokal...", expanded=True) as status:
+    live_table = st.empty()
+
+    def _on_rows(batch, so_far):
+        # tampilkan kandidat bertahap selagi feed lain masih dimuat
+        status.update(label=f"🔎 {len(so_far)} kandidat sejauh ini...")
+        live_table.dataframe(
+            pd.DataFrame(so_far)[["title", "source", "published", "url"]],
+            use_container_width=True, hide_index=True,
+        )
+
+    rows = search_multi_source_stream(
         keywords=keywords,
         max_results=max_results,
         date_start=start_date,
         date_end=end_date,
         use_google_news=use_gnews,
         use_bm25_rerank=use_bm25,
+        live=use_live,
+        on_rows=_on_rows,
     )
+    live_table.empty()
     st.caption(f"Filter tanggal aktif (WIB): {start_date} s/d {end_date}")
-    status.update(label=f"Ditemukan {len(rows)} kandidat URL.", state="complete")
+    status.update(label=f"Ditemukan {len(rows)} kandidat URL.", state="complete", expanded=False)
+
+with st.expander("🩺 Kesehatan feed (latency, status, circuit breaker)"):
+    health = pd.DataFrame(feed_health_stats())
+    if health.empty:
+        st.caption("Belum ada statistik feed.")
+    else:
+        cols_health = ["url", "state", "avg_latency_ms", "last_status", "last_entry_count",
+                       "consecutive_failures", "total_failures", "parse_errors", "last_error"]
+        st.dataframe(health[cols_health], use_container_width=True, hide_index=True)
 
 if not rows:
     st.warning("Tidak ada URL cocok. Coba perluas kata kunci atau tanggal.")
@@ -94,13 +121,26 @@ if lock_jabar:
         st.stop()
 
 st.subheader("Kandidat URL")
-st.dataframe(df_seed, use_container_width=True, hide_index=True)
+st.dataframe(df_seed.drop(columns=["published_ts"], errors="ignore"), use_container_width=True, hide_index=True)
 
 # ---------- EKSTRAKSI ----------
 urls = df_seed["url"].dropna().tolist()
 with st.status("📥 Mengunduh & mengekstrak isi artikel...", expanded=False) as status:
     arts = fetch_articles(urls, user_agent or None, max_workers=8)
-    status.update(label="Ekstraksi selesai.", state="complete")
+    prog = job_progress(job_id_for(urls, user_agent or None))
+    status.update(label=f"Ekstraksi selesai ({prog['done']} berhasil, {prog['failed']} gagal "
+                        f"[{prog['retryable']} bisa dicoba ulang], {prog['pending']} belum diproses; "
+                        "checkpoint tersimpan, rerun melanjutkan).",
+                  state="complete")
+
+n_unfinished = sum(1 for a in arts if a.get("unfinished"))
+if n_unfinished or prog["retryable"]:
+    # hasil parsial / gagal sementara jangan di-cache: rerun berikutnya melanjutkan
+    # job dari checkpoint dan mencoba ulang URL yang gagal
+    fetch_articles.clear()
+if n_unfinished:
+    st.warning(f"⏱️ {n_unfinished} URL belum selesai saat batas waktu habis (ditandai 'deadline_exceeded'). "
+               "Jalankan ulang untuk melanjutkan.")
 
 # Gabungkan hasil ekstraksi dengan seed awal
 df_art = pd.DataFrame(arts)
@@ -142,11 +182,15 @@ with st.expander("🔧 Debug ekstraksi (contoh 10)"):
 # ---------- SENTIMEN ----------
 with st.status("🧠 Memuat model & menganalisis sentimen...", expanded=False) as status:
     bundle = load_models()
-    labels, scores = batch_sentiment(df["text"].tolist(), bundle, batch_size=8)
-    status.update(label=f"Klasifikasi selesai (model: {bundle['model_name']}).", state="complete")
+    labels, scores, cluster_ids = clustered_sentiment(df["text"].tolist(), bundle, batch_size=8)
+    n_clusters = len(set(cluster_ids))
+    status.update(label=f"Klasifikasi selesai (model: {bundle['model_name']}; "
+                        f"{n_clusters} inferensi untuk {len(df)} artikel).", state="complete")
 
 df["sentiment"] = labels
 df["confidence"] = scores
+df["cluster_id"] = cluster_ids
+df["cluster_size"] = df.groupby("cluster_id")["cluster_id"].transform("size")
 
 # ---------- RINGKASAN ----------
 st.subheader("Ringkasan Sentimen")
@@ -201,7 +245,7 @@ else:
 
 
 # ---------- TABEL & UNDUH ----------
-show_cols = ["title_final", "source", "publish_final", "sentiment", "confidence", "url", "desc"]
+show_cols = ["title_final", "source", "publish_final", "sentiment", "confidence", "cluster_id", "cluster_size", "url", "desc"]
 st.subheader("Detail Hasil")
 st.dataframe(df[show_cols].rename(columns={"title_final":"title","publish_final":"published"}),
              use_container_width=True, hide_index=True)
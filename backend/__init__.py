@@ -1,2 +1,2 @@
 # backend/__init__.py
-__all__ = ["feeds", "search", "filters", "extract", "sentiment"]
+__all__ = ["feeds", "search", "filters", "extract", "sentiment", "feedcache", "feedfetch", "index", "poller", "ranking", "feedhealth", "httpclient", "downloader", "ratelimit", "htmlcache", "gnewsdecode", "extractstats", "sitetemplates", "htmldoc", "structured", "dedup", "urlcanon", "jobs"]
@@ -0,0 +1,104 @@
+# backend/dedup.py
+"""
+Deteksi artikel hampir-duplikat (berita kantor berita yang dimuat ulang
+banyak media: ANTARA → Tribun, Okezone, Sindonews, ...).
+- teks → shingle 5 kata (setelah normalize_text) → hash 32-bit
+- MinHash NUM_PERM permutasi, dihitung vektorial dengan NumPy
+- LSH berpita (BANDS x ROWS): dokumen yang berbagi satu pita jadi kandidat
+- kandidat diverifikasi dengan estimasi Jaccard ≥ DUP_THRESHOLD, lalu
+  digabung dengan union-find → satu cluster_id per teks
+"""
+import os
+import re
+import zlib
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from backend.utils import normalize_text
+
+SHINGLE_WORDS = 5
+BANDS = 20
+ROWS = 6
+NUM_PERM = BANDS * ROWS
+# ambang LSH ≈ (1/BANDS)^(1/ROWS) ≈ 0.61; verifikasi akhir memakai DUP_THRESHOLD
+DUP_THRESHOLD = float(os.getenv("NEWS_DUP_THRESHOLD", "0.7"))
+MIN_TOKENS = 20  # teks lebih pendek tidak di-cluster (terlalu sedikit shingle)
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_PRIME = np.uint64((1 << 61) - 1)
+_MASK32 = np.uint64(0xFFFFFFFF)
+
+_rng = np.random.RandomState(20240601)  # seed tetap → signature stabil antar proses
+_PERM_A = _rng.randint(1, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+_PERM_B = _rng.randint(0, 1 << 32, size=NUM_PERM, dtype=np.uint64)
+
+
+def _shingles(text: str) -> Optional[np.ndarray]:
+    toks = _TOKEN_RE.findall(normalize_text(text or ""))
+    if len(toks) < MIN_TOKENS:
+        return None
+    grams = {" ".join(toks[i:i + SHINGLE_WORDS]) for i in range(len(toks) - SHINGLE_WORDS + 1)}
+    return np.fromiter((zlib.crc32(g.encode("utf-8")) for g in grams), dtype=np.uint64, count=len(grams))
+
+
+def minhash(text: str) -> Optional[np.ndarray]:
+    """Signature MinHash (NUM_PERM x uint32) atau None bila teks terlalu pendek."""
+    sh = _shingles(text)
+    if sh is None:
+        return None
+    # (a*x + b) mod p untuk semua permutasi sekaligus: matriks NUM_PERM x shingle
+    hv = (np.outer(_PERM_A, sh) + _PERM_B[:, None]) % _PRIME & _MASK32
+    return hv.min(axis=1).astype(np.uint32)
+
+
+def _find(parent: List[int], i: int) -> int:
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def cluster_near_duplicates(texts: List[str], threshold: float = DUP_THRESHOLD) -> List[int]:
+    """
+    cluster_id per teks (sejajar input). Teks hampir-identik berbagi id;
+    id padat 0..k-1 menurut urutan kemunculan pertama.
+    """
+    n = len(texts)
+    parent = list(range(n))
+    sigs: Dict[int, np.ndarray] = {}
+    for i, t in enumerate(texts):
+        sig = minhash(t)
+        if sig is not None:
+            sigs[i] = sig
+
+    buckets: Dict[Tuple[int, bytes], List[int]] = {}
+    for i, sig in sigs.items():
+        for b in range(BANDS):
+            buckets.setdefault((b, sig[b * ROWS:(b + 1) * ROWS].tobytes()), []).append(i)
+
+    checked = set()
+    for members in buckets.values():
+        if len(members) < 2:
+            continue
+        for a, i in enumerate(members):
+            for j in members[a + 1:]:
+                ri, rj = _find(parent, i), _find(parent, j)
+                if ri == rj or (i, j) in checked:
+                    continue
+                checked.add((i, j))
+                if float(np.mean(sigs[i] == sigs[j])) >= threshold:
+                    parent[max(ri, rj)] = min(ri, rj)
+
+    ids: Dict[int, int] = {}
+    return [ids.setdefault(_find(parent, i), len(ids)) for i in range(n)]
+
+
+def cluster_representatives(texts: List[str], cluster_ids: List[int]) -> Dict[int, int]:
+    """{cluster_id: indeks teks terpanjang di cluster itu} (wakil untuk inferensi)."""
+    reps: Dict[int, int] = {}
+    for i, cid in enumerate(cluster_ids):
+        j = reps.get(cid)
+        if j is None or len(texts[i] or "") > len(texts[j] or ""):
+            reps[cid] = i
+    return reps
@@ -0,0 +1,210 @@
+# backend/downloader.py
+"""
+Unduhan halaman artikel berbasis asyncio (httpx) untuk pipeline fetch_articles.
+- konkurensi tinggi secara global, dibatasi semaphore per-host
+- satu AsyncClient (keep-alive, HTTP/2 bila paket h2 terpasang)
+- kesopanan per host lewat token bucket (backend.ratelimit); 429/503
+  memperlambat host & Retry-After dihormati sebelum mencoba lagi
+- cache HTML persisten (backend.htmlcache): entri segar dipakai tanpa request,
+  entri basi direvalidasi (ETag/Last-Modified → 304)
+- body dibaca streaming: non-HTML / melebihi MAX_PAGE_BYTES dibatalkan dini,
+  charset dari header → <meta charset> → detektor atas prefix
+- on_page(url, page) dipanggil begitu satu halaman selesai, sehingga
+  ekstraksi bisa mulai selagi unduhan lain masih berjalan
+- batas waktu: url_budget per URL (dihitung sejak slot host didapat) &
+  deadline global (epoch); unduhan yang melewatinya dibatalkan →
+  page["timed_out"] = True
+"""
+import asyncio
+import time
+import urllib.parse
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+from backend.htmlcache import get_cached_page, put_cached_page, revalidation_headers, touch_cached_page
+from backend.httpclient import (
+    CHUNK_BYTES, DEFAULT_HEADERS, DEFAULT_UA, MAX_PAGE_BYTES, decode_html, is_html_type,
+)
+from backend.ratelimit import THROTTLE_STATUSES, HostRateLimiter, get_limiter
+from backend.utils import run_async
+
+try:  # HTTP/2 hanya bila paket h2 terpasang
+    import h2  # noqa: F401
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
+MAX_RETRY_WAIT = 30.0  # tunggu Retry-After lebih lama dari ini → menyerah
+
+
+def _host(url: str) -> str:
+    return urllib.parse.urlparse(url).netloc.lower()
+
+
+def _from_cache(entry: Dict) -> Dict:
+    return {
+        "final_url": entry["final_url"],
+        "status": entry["status"],
+        "content_type": entry["headers"].get("content-type", ""),
+        "html": entry["html"],
+        "from_cache": True,
+    }
+
+
+async def _stream_html(client: httpx.AsyncClient, url: str, headers: Dict[str, str], max_bytes: int) -> Dict:
+    """GET streaming: body hanya dibaca bila sukses & HTML, berhenti bila melebihi max_bytes."""
+    async with client.stream("GET", url, headers=headers) as r:
+        ctype = r.headers.get("Content-Type", "") or ""
+        length = r.headers.get("Content-Length") or ""
+        html = None
+        if r.is_success and is_html_type(ctype) and not (length.isdigit() and int(length) > max_bytes):
+            buf = bytearray()
+            async for chunk in r.aiter_bytes(CHUNK_BYTES):
+                buf += chunk
+                if len(buf) > max_bytes:
+                    buf = None
+                    break
+            if buf is not None:
+                html = decode_html(bytes(buf), ctype)
+        return {
+            "final_url": str(r.url),
+            "status": r.status_code,
+            "content_type": ctype,
+            "headers": r.headers,
+            "html": html,
+        }
+
+
+async def _download_one(
+    client: httpx.AsyncClient,
+    sem: asyncio.Semaphore,
+    url: str,
+    limiter: HostRateLimiter,
+    retries: int = 2,
+    use_cache: bool = True,
+    max_bytes: int = MAX_PAGE_BYTES,
+    budget: Optional[float] = None,
+) -> Optional[Dict]:
+    """
+    Unduh satu halaman. Returns {final_url, status, content_type, html, from_cache, elapsed}
+    atau None bila gagal. budget: detik maksimum sejak slot host didapat (antre tidak dihitung).
+    """
+    cached = await asyncio.to_thread(get_cached_page, url, True) if use_cache else None
+    if cached and cached["fresh"]:
+        return dict(_from_cache(cached), elapsed=0.0)
+
+    async def _fetch() -> Dict:
+        for attempt in range(retries + 1):
+            await limiter.acquire_async(url)
+            res = await _stream_html(client, url, revalidation_headers(cached), max_bytes)
+            await asyncio.to_thread(limiter.feedback, url, res["status"], res["headers"].get("Retry-After"))
+            if res["status"] not in THROTTLE_STATUSES or attempt == retries:
+                break
+            if await asyncio.to_thread(limiter.pending_delay, url) > MAX_RETRY_WAIT:
+                break
+        return res
+
+    async with sem:
+        started = time.time()
+        try:
+            res = await asyncio.wait_for(_fetch(), timeout=budget)
+        except asyncio.TimeoutError:
+            return dict(_timed_out(url), elapsed=time.time() - started)
+        except Exception:
+            return dict(_from_cache(cached), elapsed=time.time() - started) if cached else None
+        elapsed = time.time() - started
+
+    if res["status"] == 304 and cached:
+        await asyncio.to_thread(touch_cached_page, url)
+        return dict(_from_cache(cached), elapsed=elapsed)
+    html = res["html"]
+    if html and use_cache:
+        await asyncio.to_thread(put_cached_page, url, res["final_url"], res["status"], res["headers"], html)
+    return {
+        "final_url": res["final_url"],
+        "status": res["status"],
+        "content_type": res["content_type"],
+        "html": html,
+        "from_cache": False,
+        "elapsed": elapsed,
+    }
+
+
+def _timed_out(url: str) -> Dict:
+    return {"final_url": url, "status": None, "content_type": "", "html": None, "from_cache": False, "timed_out": True}
+
+
+async def _download_all(
+    urls: List[str],
+    user_agent: str,
+    per_host: int,
+    max_connections: int,
+    timeout: float,
+    limiter: HostRateLimiter,
+    use_cache: bool,
+    max_bytes: int,
+    on_page: Optional[Callable[[str, Optional[Dict]], None]],
+    url_budget: Optional[float],
+    deadline: Optional[float],
+) -> Dict[str, Optional[Dict]]:
+    sems: Dict[str, asyncio.Semaphore] = {}
+    for u in urls:
+        sems.setdefault(_host(u), asyncio.Semaphore(per_host))
+
+    limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+    headers = dict(DEFAULT_HEADERS, **{"User-Agent": user_agent})
+    async with httpx.AsyncClient(
+        http2=_HTTP2,
+        limits=limits,
+        timeout=httpx.Timeout(timeout),
+        follow_redirects=True,
+        headers=headers,
+    ) as client:
+        async def _one(u: str) -> Optional[Dict]:
+            t0 = time.time()
+            try:
+                page = await asyncio.wait_for(
+                    _download_one(client, sems[_host(u)], u, limiter, use_cache=use_cache,
+                                  max_bytes=max_bytes, budget=url_budget),
+                    timeout=max(0.0, deadline - t0) if deadline is not None else None,
+                )
+            except asyncio.TimeoutError:  # deadline global
+                page = dict(_timed_out(u), elapsed=time.time() - t0)
+            except Exception:
+                page = None
+            if on_page is not None:
+                on_page(u, page)
+            return page
+
+        results = await asyncio.gather(*(_one(u) for u in urls))
+    return dict(zip(urls, results))
+
+
+def download_pages(
+    urls: List[str],
+    user_agent: Optional[str] = None,
+    per_host: int = 2,
+    max_connections: int = 64,
+    timeout: float = 20.0,
+    limiter: Optional[HostRateLimiter] = None,
+    use_cache: bool = True,
+    max_bytes: int = MAX_PAGE_BYTES,
+    on_page: Optional[Callable[[str, Optional[Dict]], None]] = None,
+    url_budget: Optional[float] = None,
+    deadline: Optional[float] = None,
+) -> Dict[str, Optional[Dict]]:
+    """
+    Unduh semua URL secara konkuren (URL duplikat diunduh sekali).
+    limiter: token bucket per host (default: limiter bersama proses ini).
+    use_cache: baca/tulis cache HTML persisten (backend.htmlcache).
+    max_bytes: batas ukuran body; halaman lebih besar dianggap gagal (html=None).
+    url_budget: detik maksimum per URL (termasuk retry, tidak termasuk antre slot host);
+    deadline: epoch batas seluruh unduhan. Yang lewat → page dengan timed_out=True & html=None.
+    Returns: {url: page | None}; page["elapsed"] = detik yang terpakai.
+    """
+    uniq = list(dict.fromkeys(u for u in urls if u))
+    return run_async(_download_all(
+        uniq, user_agent or DEFAULT_UA, per_host, max_connections, timeout, limiter or get_limiter(),
+        use_cache, max_bytes, on_page, url_budget, deadline,
+    ))
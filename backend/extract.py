@@ -2,23 +2,32 @@
 from __future__ import annotations
 
 import html as htmllib
+import multiprocessing
+import os
 import re
+import threading
 import time
-import random
-import urllib.parse
 from typing import List, Dict, Optional, Tuple
 
 import requests
 import streamlit as st
-import trafilatura
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from concurrent.futures import TimeoutError as FuturesTimeout
+from concurrent.futures.process import BrokenProcessPool
 
 import base64
-from urllib.parse import urlparse, parse_qs
 
-import json
-from urllib.parse import quote, urlparse
-from bs4 import BeautifulSoup
+from backend.downloader import download_pages
+from backend.extractstats import domain_of, extractor_order, record_outcomes
+from backend.gnewsdecode import resolve_gnews_batch
+from backend.htmlcache import get_cached_page, put_cached_page
+from backend.jobs import checkpoint_writer, job_state, start_job
+from backend.htmldoc import HtmlDocument
+from backend.httpclient import DEFAULT_UA, get_session, read_html
+from backend.ratelimit import THROTTLE_STATUSES, get_limiter
+from backend.sitetemplates import extract_with_template, template_for
+from backend.structured import extract_structured, has_structured_data
+from backend.urlcanon import canonicalize, clean_url
 
 
 # =========================
@@ -37,112 +46,14 @@ def _first_external_href(html_text: str) -> Optional[str]:
     return None
 
 
-def get_decoding_params(gn_art_id: str, session: requests.Session) -> Dict:
-    """
-    Ambil parameter decoding (signature, timestamp) dari Google News article.
-    Fallback: coba /articles dulu, kalau gagal coba /rss/articles
-    """
-    urls_to_try = [
-        f"https://news.google.com/articles/{gn_art_id}",
-        f"https://news.google.com/rss/articles/{gn_art_id}"
-    ]
-    
-    for url in urls_to_try:
-        try:
-            response = session.get(url, timeout=10)
-            if not response.ok:
-                continue
-                
-            soup = BeautifulSoup(response.text, "html.parser")
-            div = soup.select_one("c-wiz > div")
-            
-            if div:
-                signature = div.get("data-n-a-sg")
-                timestamp = div.get("data-n-a-ts")
-                
-                if signature and timestamp:
-                    return {
-                        "signature": signature,
-                        "timestamp": timestamp,
-                        "gn_art_id": gn_art_id,
-                    }
-        except Exception:
-            continue
-    
-    raise ValueError(f"Cannot get decoding params for {gn_art_id}")
-
-
-def decode_google_news_batch(articles: List[Dict], session: requests.Session) -> List[str]:
-    """
-    Decode multiple Google News URLs menggunakan batchexecute API.
-    Articles format: [{"signature": "...", "timestamp": "...", "gn_art_id": "..."}]
-    Returns: List of decoded URLs
-    """
-    articles_reqs = [
-        [
-            "Fbv4je",
-            f'["garturlreq",[[\"X\",\"X\",[\"X\",\"X\"],null,null,1,1,\"US:en\",null,1,null,null,null,null,null,0,1],\"X\",\"X\",1,[1,1,1],1,1,null,0,0,null,0],"{art["gn_art_id"]}",{art["timestamp"]},"{art["signature"]}"]',
-        ]
-        for art in articles
-    ]
-    
-    payload = f"f.req={quote(json.dumps([articles_reqs]))}"
-    headers = {
-        "Content-Type": "application/x-www-form-urlencoded;charset=UTF-8",
-        "Referer": "https://news.google.com/"
-    }
-    
-    try:
-        response = session.post(
-            url="https://news.google.com/_/DotsSplashUi/data/batchexecute",
-            headers=headers,
-            data=payload,
-            timeout=20
-        )
-        response.raise_for_status()
-        
-        # Parse response
-        parts = response.text.split("\n\n")
-        if len(parts) < 2:
-            raise ValueError("Invalid batchexecute response")
-        
-        decoded = json.loads(parts[1])
-        return [json.loads(res[2])[1] for res in decoded[:-2]]
-        
-    except Exception as e:
-        raise ValueError(f"Batch decode failed: {e}")
-
-
-def resolve_gnews_new(url: str, session: requests.Session) -> str:
+def resolve_gnews_new(url: str, session: requests.Session, deadline: Optional[float] = None) -> str:
     """
     Resolve Google News URL menggunakan metode batchexecute (2024-2025).
     Metode ini diperlukan untuk URL format /articles/ atau /rss/articles/
+    (pemetaan permanen dicek dulu; lihat backend.gnewsdecode)
     """
     try:
-        parsed = urlparse(url)
-        path_parts = parsed.path.split("/")
-        
-        # Extract article ID dari URL
-        gn_art_id = None
-        if "articles" in path_parts:
-            idx = path_parts.index("articles")
-            if idx + 1 < len(path_parts):
-                gn_art_id = path_parts[idx + 1]
-        
-        if not gn_art_id:
-            return url
-        
-        # Get decoding params
-        params = get_decoding_params(gn_art_id, session)
-        
-        # Decode URL
-        decoded_urls = decode_google_news_batch([params], session)
-        
-        if decoded_urls and len(decoded_urls) > 0:
-            return decoded_urls[0]
-        
-        return url
-        
+        return resolve_gnews_batch([url], session, deadline=deadline).get(url) or url
     except Exception as e:
         st.warning(f"⚠️ Google News decode error: {str(e)[:100]}")
         return url
@@ -228,64 +139,77 @@ def resolve_gnews_advanced(url: str, session: requests.Session, timeout: int = 2
 
 
 
-def _apply_meta_from_html(dest: Dict, html_text: str) -> None:
-    """Isi title/date/desc dari metadata trafilatura bila tersedia."""
-    try:
-        meta = trafilatura.metadata.extract_metadata(html_text)
-        if meta:
-            dest["title_article"] = dest.get("title_article") or meta.title
-            dest["publish_date"] = dest.get("publish_date") or meta.date
-            dest["meta_desc"] = dest.get("meta_desc") or meta.description
-    except Exception:
-        pass
-
+def _apply_meta(dest: Dict, doc: HtmlDocument) -> None:
+    """Isi title/date/desc dari metadata trafilatura (pohon dokumen yang sama) bila tersedia."""
+    meta = doc.metadata()
+    dest["title_article"] = dest.get("title_article") or meta.get("title")
+    dest["publish_date"] = dest.get("publish_date") or meta.get("date")
+    dest["meta_desc"] = dest.get("meta_desc") or meta.get("description")
 
-def _find_amp_and_canonical(html_text: str) -> Tuple[Optional[str], Optional[str]]:
-    """Cari <link rel='amphtml'> dan <link rel='canonical'> sederhana via regex."""
-    amp_url = None
-    canonical_url = None
-    try:
-        m_amp = re.search(
-            r'<link[^>]+rel=["\']amphtml["\'][^>]+href=["\']([^"\']+)["\']',
-            html_text, re.I
-        )
-        if m_amp:
-            amp_url = m_amp.group(1)
 
-        m_canon = re.search(
-            r'<link[^>]+rel=["\']canonical["\'][^>]+href=["\']([^"\']+)["\']',
-            html_text, re.I
-        )
-        if m_canon:
-            canonical_url = m_canon.group(1)
-    except Exception:
-        pass
-    return amp_url, canonical_url
+_JS_INDICATORS = ('reactroot', '__next', 'nuxt', 'ng-version', 'data-vue-app')
 
 
-def _extract_with_trafilatura(html: Optional[str], src_url: str) -> Optional[str]:
-    """Pembungkus trafilatura.extract dengan opsi yang cenderung lebih 'recall'."""
-    try:
-        return trafilatura.extract(
-            html=html, url=src_url,
-            include_comments=False,
-            include_tables=False,
-            with_metadata=True,
-            favor_recall=True
-        )
-    except Exception:
-        return None
+def _is_js_heavy(html_text: str) -> bool:
+    """Halaman kecil berisi kerangka SPA (React/Next/Nuxt/Angular/Vue) → teks dirender di browser."""
+    if not html_text or len(html_text) >= 5000:
+        return False
+    lowered = html_text.lower()
+    return any(indicator in lowered for indicator in _JS_INDICATORS)
 
 
 # =========================
 # Main extractors
 # =========================
 
-def fetch_article(url: str, user_agent: Optional[str] = None) -> Dict:
+# urutan bawaan cascade; per domain diurutkan ulang oleh backend.extractstats
+EXTRACTOR_ORDER = ["structured", "template", "trafilatura", "amp", "ampcache", "readability", "boilerpy3", "justext"]
+
+def _resolve_final_url(
+    url: str, session: requests.Session, deadline: Optional[float] = None,
+) -> Tuple[str, Optional[str]]:
+    """Resolve Google News → URL publisher. Returns (final_url, error)."""
+    final_url = url
+    error = None
+    try:
+        if "news.google.com" in url:
+            # Gunakan metode baru batchexecute
+            final_url = resolve_gnews_new(url, session, deadline)
+            
+            # Cek apakah berhasil
+            if "news.google.com" in final_url:
+                error = "gnews_unresolved"
+                st.warning(f"⚠️ Gagal resolve Google News: {url[:80]}...")
+            else:
+                final_url = clean_url(final_url)
+                st.success(f"✅ Resolved: {final_url[:80]}...")
+                
+    except Exception as e:
+        error = f"resolve_gnews: {e}"
+        st.error(f"❌ Error resolving: {str(e)[:100]}")
+    return final_url, error
+
+
+def fetch_article(
+    url: str,
+    user_agent: Optional[str] = None,
+    final_url: Optional[str] = None,
+    prefetched_html: Optional[str] = None,
+    offline: bool = False,
+    deadline: Optional[float] = None,
+) -> Dict:
     """
     Ekstraksi berlapis dari suatu URL.
     - Handle khusus Google News (resolve ke publisher)
-    - Trafilatura → AMP fallback → Readability → Boilerpy3 → JusText
+    - Data terstruktur (JSON-LD/Next/Nuxt) → Template publisher → Trafilatura → AMP fallback → AMP cache → Readability → Boilerpy3 → JusText
+      (urutan bawaan; per domain diurutkan ulang dari statistik keberhasilan)
+    - tiap URL (asli, AMP, AMP cache) diunduh maksimal sekali per panggilan
+    final_url/prefetched_html: hasil resolve & unduhan dari pipeline fetch_articles
+    (bila ada, langkah resolve/unduh halaman utama dilewati).
+    Halaman utama dibaca dari cache HTML persisten bila masih segar;
+    offline=True → re-ekstraksi murni dari cache (entri basi pun dipakai), tanpa request.
+    deadline: epoch batas waktu bersama semua langkah (request ikut dipotong); lewat →
+    cascade berhenti dengan error "deadline_exceeded".
     Mengembalikan dict minimal: {url, final_url, title_article, text, publish_date, meta_desc}
     """
     data: Dict = {
@@ -300,216 +224,266 @@ def fetch_article(url: str, user_agent: Optional[str] = None) -> Dict:
         "error": None,
     }
 
-    UA = user_agent or (
-        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
-        "(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
-    )
-    headers = {
-        "User-Agent": UA,
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-        "Accept-Language": "id-ID,id;q=0.9,en-US;q=0.8,en;q=0.7",
-        "Cache-Control": "no-cache",
-        "Pragma": "no-cache",
-        "Connection": "keep-alive",
-        "Referer": "https://news.google.com/",
-    }
-
-    session = requests.Session()
-    session.headers.update(headers)
+    UA = user_agent or DEFAULT_UA
+    session = get_session(UA)  # session bersama: koneksi keep-alive per host dipakai ulang
 
     # STEP 0 — resolve Google News → publisher (METODE BARU)
-    final_url = url
-    first_html: Optional[str] = None
-    
-    try:
-        if "news.google.com" in url:
-            # Gunakan metode baru batchexecute
-            final_url = resolve_gnews_new(url, session)
-            
-            # Cek apakah berhasil
-            if "news.google.com" in final_url:
-                data["error"] = "gnews_unresolved"
-                st.warning(f"⚠️ Gagal resolve Google News: {url[:80]}...")
-            else:
-                st.success(f"✅ Resolved: {final_url[:80]}...")
-                
-    except Exception as e:
-        data["error"] = f"resolve_gnews: {e}"
-        st.error(f"❌ Error resolving: {str(e)[:100]}")
+    if final_url is None:
+        if offline:
+            final_url = url
+        else:
+            final_url, data["error"] = _resolve_final_url(url, session, deadline)
+    first_html: Optional[str] = prefetched_html
+    if first_html is None:
+        cached = get_cached_page(final_url, allow_stale=offline)
+        if cached:
+            first_html = cached["html"]
+            final_url = cached["final_url"] or final_url
     
     data["final_url"] = final_url
 
-    # Helper: simple backoff for 429/503
+    def remaining() -> float:
+        return deadline - time.time() if deadline is not None else float("inf")
+
+    # Helper: request sopan per host; 429/503 + Retry-After diatur token bucket
+    limiter = get_limiter()
+
     def get_with_backoff(u: str, tries: int = 3, tout: int = 20) -> Optional[requests.Response]:
+        """Respons streaming (body belum dibaca) → baca dengan read_html()."""
+        if offline:
+            return None
         for i in range(tries):
+            # tunggu token bucket / timeout request tidak boleh melewati deadline
+            if limiter.pending_delay(u) >= remaining():
+                return None
+            limiter.acquire(u)
             try:
-                r = session.get(u, timeout=tout, allow_redirects=True)
-                if r.status_code in (429, 503):
-                    time.sleep((2 ** i) + random.random())
-                    continue
-                return r
+                r = session.get(u, timeout=min(tout, max(remaining(), 0.1)), allow_redirects=True, stream=True)
             except Exception:
-                time.sleep((2 ** i) * 0.5 + random.random())
+                continue
+            limiter.feedback(u, r.status_code, r.headers.get("Retry-After"))
+            if r.status_code in THROTTLE_STATUSES:
+                r.close()
+                continue
+            return r
         return None
 
-    # ✅ Optimasi AMP Cache - TARUH DI SINI (setelah helper function)
-    html = None
-    if data["final_url"]:
-        # Coba AMP cache dulu untuk bypass paywall
-        amp_cache_url = f"https://news-google-com.cdn.ampproject.org/c/s/{data['final_url'].replace('https://', '')}"
-        try:
-            r_amp = get_with_backoff(amp_cache_url)
-            if r_amp and r_amp.ok:
-                html = r_amp.text
-        except Exception:
-            pass
-
-    # STEP 1 — trafilatura.fetch_url langsung di final_url
-    try:
-        downloaded = trafilatura.fetch_url(final_url, no_ssl=True, user_agent=UA)
-        if downloaded:
-            extracted = _extract_with_trafilatura(downloaded, final_url)
-            if extracted and len(extracted) > 120:
-                data["text"] = extracted
-                _apply_meta_from_html(data, downloaded)
-                if not data["title_article"]:
-                    try:
-                        bex = trafilatura.bare_extraction(downloaded, with_metadata=True)
-                        if bex and "title" in bex:
-                            data["title_article"] = bex["title"]
-                    except Exception:
-                        pass
-                data["extractor_used"] = "trafilatura.fetch_url"
-                return data
-    except Exception:
-        pass
+    # Rencana unduh: tiap URL (asli, AMP, AMP cache) diunduh maksimal sekali,
+    # di-decode & di-parse sekali (HtmlDocument), lalu dipakai bersama semua extractor
+    # (kunci: clean_url → varian utm_*/fragment tidak diunduh dua kali)
+    pages: Dict[str, Optional[Dict]] = {}
+    if first_html is not None:
+        pages[clean_url(final_url)] = {"final_url": final_url, "doc": HtmlDocument(first_html, final_url)}
+
+    def fetch_once(u: str) -> Optional[Dict]:
+        key = clean_url(u)
+        if key in pages:
+            return pages[key]
+        page = None
+        r = get_with_backoff(u)
+        if r is not None:
+            # streaming: batal dini bila bukan HTML / melebihi MAX_PAGE_BYTES
+            html = read_html(r, deadline=deadline) if r.ok else None
+            r.close()
+            if html:
+                doc = HtmlDocument(html, u)
+                page = {"final_url": r.url or u, "doc": doc}
+                put_cached_page(u, r.url, r.status_code, r.headers, html)
+        pages[key] = page
+        return page
+
+    def origin_doc() -> Optional[HtmlDocument]:
+        page = fetch_once(final_url)
+        if page is None:
+            return None
+        data["final_url"] = page["final_url"]
+        return page["doc"]
+
+    amp_cache_url = (
+        f"https://news-google-com.cdn.ampproject.org/c/s/{final_url[len('https://'):]}"
+        if final_url and final_url.startswith("https://") else None
+    )
 
-    # STEP 2 — requests ke final_url (pakai first_html kalau sudah ada dari resolver)
-    html = first_html
-    if html is None:
-        r = get_with_backoff(final_url)
-        if r and r.ok and "text/html" in (r.headers.get("Content-Type", "") or ""):
-            r.encoding = r.apparent_encoding or r.encoding
-            html = r.text
-            data["final_url"] = r.url or final_url
-            
-        # ✅ TARUH DI SINI - Cek JavaScript-heavy site
-    if html and len(html) < 5000 and 'reactroot' in html.lower():
-        data["error"] = "javascript_heavy_site"
-        return data
-    
-    # Atau cek variasi lainnya
-    if html and len(html) < 5000:
-        js_indicators = ['reactroot', '__next', 'nuxt', 'ng-version', 'data-vue-app']
-        if any(indicator in html.lower() for indicator in js_indicators):
-            data["error"] = "javascript_heavy_site"
-            return data
-
-    # STEP 3 — trafilatura.extract dari HTML mentah
-    if html:
-        extracted = _extract_with_trafilatura(html, data["final_url"] or final_url)
-        if extracted and len(extracted) > 120:
-            data["text"] = extracted
-            _apply_meta_from_html(data, html)
-            if not data["title_article"]:
-                try:
-                    bex = trafilatura.bare_extraction(html, with_metadata=True)
-                    if bex and "title" in bex:
-                        data["title_article"] = bex["title"]
-                except Exception:
-                    pass
-            # canonical/AMP
-            amp_u, canon_u = _find_amp_and_canonical(html)
-            if canon_u:
-                data["final_url"] = canon_u
-            data["extractor_used"] = "trafilatura.extract(html)"
-            return data
-
-        # STEP 3b — AMP fallback (sering lebih bersih)
-        amp_u, canon_u = _find_amp_and_canonical(html)
-        if amp_u:
-            r_amp = get_with_backoff(amp_u)
-            if r_amp and r_amp.ok:
-                r_amp.encoding = r_amp.apparent_encoding or r_amp.encoding
-                amp_html = r_amp.text
-                extracted = _extract_with_trafilatura(amp_html, amp_u)
-                if extracted and len(extracted) > 100:
-                    data["text"] = extracted
-                    data["final_url"] = canon_u or amp_u
-                    _apply_meta_from_html(data, amp_html)
-                    data["extractor_used"] = "AMP(trafilatura)"
-                    return data
-
-    # STEP 4 — readability-lxml
-    try:
+    def base_html() -> Optional[str]:
+        """HTML untuk extractor generik: halaman asli, atau AMP cache bila asli gagal diunduh."""
+        doc = origin_doc()
+        if doc is None and amp_cache_url:
+            page = fetch_once(amp_cache_url)
+            doc = page["doc"] if page else None
+        return doc.html if doc is not None else None
+
+    # Tiap langkah: True = teks didapat, False = gagal, None = tidak berlaku (tanpa input)
+
+    # STEP structured — JSON-LD / __NEXT_DATA__ / Nuxt state (juga untuk situs JS-heavy)
+    def step_structured() -> Optional[bool]:
+        doc = origin_doc()
+        if doc is None or not has_structured_data(doc.tree):
+            return None
+        res = extract_structured(doc.tree, doc.html)
+        if not res:
+            return False
+        data["text"] = res["text"]
+        data["title_article"] = data.get("title_article") or res["title"]
+        data["publish_date"] = data.get("publish_date") or res["publish_date"]
+        data["meta_desc"] = data.get("meta_desc") or res["meta_desc"]
+        data["extractor_used"] = f"structured({res['source']})"
+        return True
+
+    # STEP template — selector publisher terkompilasi (jalur cepat, divalidasi)
+    def step_template() -> Optional[bool]:
+        if template_for(domain) is None:
+            return None
+        doc = origin_doc()
+        if doc is None or not doc.html:
+            return None
+        res = extract_with_template(domain, doc.html, tree=doc.tree)
+        if not res:
+            return False
+        data["text"] = res["text"]
+        data["title_article"] = data.get("title_article") or res["title"]
+        data["publish_date"] = data.get("publish_date") or res["publish_date"]
+        data["meta_desc"] = data.get("meta_desc") or res["meta_desc"]
+        data["extractor_used"] = "template"
+        return True
+
+    # STEP trafilatura — halaman asli → trafilatura (teks + metadata satu pass)
+    def step_trafilatura() -> Optional[bool]:
+        doc = origin_doc()
+        if doc is None or not doc.html:
+            return None
+        extracted = doc.text()
+        if not (extracted and len(extracted) > 120):
+            return False
+        data["text"] = extracted
+        _apply_meta(data, doc)
+        amp_u, canon_u = doc.links()
+        if canon_u:
+            data["final_url"] = canon_u
+        data["extractor_used"] = "trafilatura"
+        return True
+
+    # STEP amp — AMP fallback (sering lebih bersih)
+    def step_amp() -> Optional[bool]:
+        doc = origin_doc()
+        if doc is None or not doc.html:
+            return None
+        amp_u, canon_u = doc.links()
+        if not amp_u:
+            return None
+        amp_page = fetch_once(amp_u)
+        if not amp_page:
+            return False
+        extracted = amp_page["doc"].text()
+        if not (extracted and len(extracted) > 100):
+            return False
+        data["text"] = extracted
+        data["final_url"] = canon_u or amp_u
+        _apply_meta(data, amp_page["doc"])
+        data["extractor_used"] = "AMP(trafilatura)"
+        return True
+
+    # STEP ampcache — AMP cache Google (bypass paywall / halaman asli gagal diunduh)
+    def step_ampcache() -> Optional[bool]:
+        if not amp_cache_url:
+            return None
+        cache_page = fetch_once(amp_cache_url)
+        if not cache_page:
+            return False
+        extracted = cache_page["doc"].text()
+        if not (extracted and len(extracted) > 100):
+            return False
+        data["text"] = extracted
+        _apply_meta(data, cache_page["doc"])
+        data["extractor_used"] = "AMPcache(trafilatura)"
+        return True
+
+    # STEP readability — readability-lxml (HTML yang sama, tanpa unduh ulang)
+    def step_readability() -> Optional[bool]:
         from readability import Document
+        html = base_html()
         if not html:
-            r = get_with_backoff(final_url)
-            if r and r.ok:
-                r.encoding = r.apparent_encoding or r.encoding
-                html = r.text
-                data["final_url"] = r.url or final_url
-        if html:
-            doc = Document(html)
-            content_html = doc.summary()
-            text = re.sub(r"<[^>]+>", " ", content_html or "")
-            text = re.sub(r"\s+", " ", text).strip()
-            if len(text) > 100:
-                data["text"] = text
-                data["title_article"] = data.get("title_article") or (doc.short_title() or None)
-                data["extractor_used"] = "readability"
-                return data
-    except Exception:
-        pass
-
-    # STEP 5 — boilerpy3
-    try:
+            return None
+        doc = Document(html)
+        content_html = doc.summary()
+        text = re.sub(r"<[^>]+>", " ", content_html or "")
+        text = re.sub(r"\s+", " ", text).strip()
+        if len(text) <= 100:
+            return False
+        data["text"] = text
+        data["title_article"] = data.get("title_article") or (doc.short_title() or None)
+        data["extractor_used"] = "readability"
+        return True
+
+    # STEP boilerpy3
+    def step_boilerpy3() -> Optional[bool]:
         from boilerpy3 import extractors
+        html = base_html()
         if not html:
-            r = get_with_backoff(final_url)
-            if r and r.ok:
-                r.encoding = r.apparent_encoding or r.encoding
-                html = r.text
-                data["final_url"] = r.url or final_url
-        if html:
-            extractor = extractors.ArticleExtractor()
-            text = extractor.get_content(html)
-            text = re.sub(r"\s+", " ", text or "").strip()
-            if len(text) > 100:
-                data["text"] = text
-                data["extractor_used"] = "boilerpy3"
-                return data
-    except Exception:
-        pass
-
-    # STEP 6 — jusText
-    try:
+            return None
+        extractor = extractors.ArticleExtractor()
+        text = extractor.get_content(html)
+        text = re.sub(r"\s+", " ", text or "").strip()
+        if len(text) <= 100:
+            return False
+        data["text"] = text
+        data["extractor_used"] = "boilerpy3"
+        return True
+
+    # STEP jusText
+    def step_justext() -> Optional[bool]:
         import justext
+        html = base_html()
         if not html:
-            r = get_with_backoff(final_url)
-            if r and r.ok:
-                r.encoding = r.apparent_encoding or r.encoding
-                html = r.text
-                data["final_url"] = r.url or final_url
-        if html:
-            # encoding guard
-            enc = "utf-8"
+            return None
+        paragraphs = justext.justext(
+            html.encode("utf-8", errors="ignore"),
+            justext.get_stoplist("Indonesian"),
+            encoding="utf-8",
+        )
+        text = " ".join(p.text for p in paragraphs if not p.is_boilerplate)
+        text = re.sub(r"\s+", " ", text or "").strip()
+        if len(text) <= 100:
+            return False
+        data["text"] = text
+        data["extractor_used"] = "jusText"
+        return True
+
+    steps = {
+        "structured": step_structured,
+        "template": step_template,
+        "trafilatura": step_trafilatura,
+        "amp": step_amp,
+        "ampcache": step_ampcache,
+        "readability": step_readability,
+        "boilerpy3": step_boilerpy3,
+        "justext": step_justext,
+    }
+
+    # Urutan cascade per domain dari statistik (langkah yang tak pernah berhasil dilewati)
+    domain = domain_of(final_url)
+    outcomes: List[Tuple[str, bool, float]] = []
+    try:
+        for name in extractor_order(domain, EXTRACTOR_ORDER):
+            if remaining() <= 0:
+                data["error"] = "deadline_exceeded"
+                break
+            # ✅ Cek JavaScript-heavy site (setelah trafilatura gagal)
+            origin = pages.get(clean_url(final_url))
+            if name not in ("structured", "template", "trafilatura") and origin and _is_js_heavy(origin["doc"].html):
+                data["error"] = "javascript_heavy_site"
+                break
+            t0 = time.perf_counter()
             try:
-                enc = r.encoding or "utf-8"  # type: ignore[name-defined]
+                ok = steps[name]()
             except Exception:
-                pass
-            paragraphs = justext.justext(
-                html.encode(enc, errors="ignore"),
-                justext.get_stoplist("Indonesian")
-            )
-            text = " ".join(p.text for p in paragraphs if not p.is_boilerplate)
-            text = re.sub(r"\s+", " ", text or "").strip()
-            if len(text) > 100:
-                data["text"] = text
-                data["extractor_used"] = "jusText"
-                return data
-    except Exception:
-        pass
+                ok = False
+            if ok is not None:
+                outcomes.append((name, bool(ok), (time.perf_counter() - t0) * 1000))
+            if ok:
+                break
+    finally:
+        if not offline:
+            record_outcomes(domain, outcomes)
 
     # Jika semua gagal
     if not data.get("text"):
@@ -517,28 +491,202 @@ def fetch_article(url: str, user_agent: Optional[str] = None) -> Dict:
     return data
 
 
+EXTRACT_PROCS = int(os.getenv("NEWS_EXTRACT_PROCS", str(os.cpu_count() or 2)))  # 0 → thread saja
+# batas waktu: seluruh pemanggilan fetch_articles & per URL (unduh + semua langkah cascade); 0 → tanpa batas
+RUN_BUDGET = float(os.getenv("NEWS_RUN_BUDGET", "180"))
+URL_BUDGET = float(os.getenv("NEWS_URL_BUDGET", "45"))
+
+_extract_pool: Optional[Executor] = None
+_extract_pool_lock = threading.Lock()
+
+
+def _get_extract_pool() -> Executor:
+    """Pool ekstraksi bersama: proses (seukuran core) agar parsing tidak berebut GIL."""
+    global _extract_pool
+    with _extract_pool_lock:
+        if _extract_pool is None:
+            if EXTRACT_PROCS > 0:
+                try:
+                    ctx = multiprocessing.get_context(
+                        "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+                    )
+                    _extract_pool = ProcessPoolExecutor(max_workers=EXTRACT_PROCS, mp_context=ctx)
+                except Exception:
+                    _extract_pool = None
+            if _extract_pool is None:
+                _extract_pool = ThreadPoolExecutor(max_workers=max(4, os.cpu_count() or 2))
+        return _extract_pool
+
+
+def _reset_extract_pool() -> None:
+    global _extract_pool
+    with _extract_pool_lock:
+        pool, _extract_pool = _extract_pool, None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def _extract_worker(url: str, user_agent: Optional[str], final_url: str,
+                    html: Optional[str], resolve_error: Optional[str],
+                    budget: Optional[float] = None, deadline: Optional[float] = None) -> Dict:
+    """
+    Dijalankan di proses pool: cascade ekstraksi atas HTML yang sudah diunduh.
+    budget (detik) mulai dihitung saat worker jalan (antre di pool tidak dihitung),
+    dibatasi deadline global (epoch).
+    """
+    if budget is not None:
+        deadline = min(deadline or float("inf"), time.time() + budget)
+    data = fetch_article(url, user_agent, final_url=final_url, prefetched_html=html, deadline=deadline)
+    if resolve_error and not data.get("error"):
+        data["error"] = resolve_error
+    return data
+
+
+def _failed(url: str, error: str) -> Dict:
+    return {
+        "url": url,
+        "final_url": None,
+        "title_article": None,
+        "text": None,
+        "publish_date": None,
+        "meta_desc": None,
+        "extractor_used": None,
+        "error": error,
+    }
+
+
+def _unfinished(url: str) -> Dict:
+    """URL yang belum selesai saat deadline global (tidak di-checkpoint → tetap pending)."""
+    return dict(_failed(url, "deadline_exceeded"), unfinished=True)
+
+
 @st.cache_data(show_spinner=False)
-def fetch_articles(urls: List[str], user_agent: Optional[str] = None, max_workers: int = 8) -> List[Dict]:
-    """Parallel fetch dengan sedikit delay agar tidak agresif."""
-    def fetch_with_delay(u: str) -> Dict:
-        time.sleep(random.uniform(1.5, 3.5))  # sopan
-        return fetch_article(u, user_agent)
-
-    out: List[Dict] = []
-    with ThreadPoolExecutor(max_workers=max_workers) as ex:
-        futures = [ex.submit(fetch_with_delay, u) for u in urls]
-        for fut in as_completed(futures):
-            try:
-                out.append(fut.result())
-            except Exception as e:
-                out.append({
-                    "url": u,  # type: ignore[name-defined]
-                    "final_url": None,
-                    "title_article": None,
-                    "text": None,
-                    "publish_date": None,
-                    "meta_desc": None,
-                    "extractor_used": None,
-                    "error": f"executor: {e}",
-                })
+def fetch_articles(
+    urls: List[str],
+    user_agent: Optional[str] = None,
+    max_workers: int = 8,
+    budget: Optional[float] = None,
+    url_budget: Optional[float] = None,
+) -> List[Dict]:
+    """
+    Pipeline dua tahap:
+    1) resolve Google News (batch, max_workers thread) + unduh halaman via asyncio
+       (konkurensi tinggi, dibatasi token bucket per host)
+    2) tiap halaman yang selesai langsung dikirim ke pool ekstraksi (proses)
+    Halaman yang gagal diunduh tetap diproses cascade (unduh ulang dengan backoff).
+    Berjalan sebagai job ber-checkpoint (backend.jobs): hasil tiap URL disimpan
+    begitu selesai, dan pemanggilan ulang dengan input sama hanya memproses URL
+    yang masih pending / gagal tapi masih bisa dicoba ulang. Hasil final per URL dari
+    job lain (dalam JOB_TTL) ikut dipakai, jadi daftar URL yang sedikit berbeda pun
+    tidak mengekstrak ulang artikel yang sudah selesai.
+    Batas waktu (default RUN_BUDGET / URL_BUDGET detik): url_budget dipakai bersama
+    unduhan + semua langkah cascade satu URL; saat budget global habis, sisa unduhan
+    & ekstraksi dibatalkan dan hasil parsial dikembalikan — URL yang belum selesai
+    ditandai unfinished=True, error "deadline_exceeded".
+    """
+    budget = RUN_BUDGET if budget is None else budget
+    url_budget = URL_BUDGET if url_budget is None else url_budget
+    deadline = time.time() + budget if budget > 0 else None
+    url_budget = url_budget if url_budget > 0 else None
+    urls = list(dict.fromkeys(u for u in urls if u))
+    job_id = start_job(urls, user_agent)
+    finished, _todo = job_state(job_id)
+    done_urls = {r.get("url") for r in finished}
+    urls = [u for u in urls if u not in done_urls]
+    if not urls:
+        return finished
+    session = get_session(user_agent or DEFAULT_UA)
+
+    # 1a) resolve Google News → publisher (batch + pemetaan permanen), dibatasi deadline
+    resolved: Dict[str, Tuple[str, Optional[str]]] = {}
+    unfinished: List[Dict] = []
+    gnews = [u for u in urls if "news.google.com" in u]
+    if gnews:
+        decoded = resolve_gnews_batch(gnews, session, max_workers=max_workers, deadline=deadline)
+        for u in gnews:
+            if u not in decoded:  # terpotong deadline → tidak diunduh/diekstrak
+                unfinished.append(_unfinished(u))
+            elif decoded.get(u):
+                resolved[u] = (clean_url(decoded[u]), None)
+            else:
+                resolved[u] = (u, "gnews_unresolved")
+                st.warning(f"⚠️ Gagal resolve Google News: {u[:80]}...")
+    # kelompokkan per artikel kanonik: varian m./www./AMP/utm_* (termasuk hasil
+    # resolve Google News) diunduh & diekstrak sekali, URL pertama jadi wakil
+    by_final: Dict[str, List[str]] = {}
+    fetch_for: Dict[str, str] = {}
+    pending_gnews = {r["url"] for r in unfinished}
+    for u in urls:
+        if u in pending_gnews:
+            continue
+        final_url, _err = resolved.get(u, (u, None))
+        final_url = fetch_for.setdefault(canonicalize(final_url), final_url)
+        by_final.setdefault(final_url, []).append(u)
+
+    # 1b) unduh asyncio → 2) ekstraksi di pool begitu halaman tiba
+    pool = _get_extract_pool()
+    futures: Dict = {}
+    failed: List[Dict] = []
+    futures_lock = threading.Lock()
+
+    def _on_page(final_url: str, page: Optional[Dict]) -> None:
+        html = page.get("html") if page else None
+        landed = (page or {}).get("final_url") or final_url
+        # sisa budget URL setelah unduhan (dipakai bersama semua langkah cascade)
+        left = url_budget - (page or {}).get("elapsed", 0.0) if url_budget is not None else None
+        group = by_final.get(final_url, [])
+        if not group:
+            return
+        if deadline is not None and time.time() >= deadline:
+            with futures_lock:
+                unfinished.extend(_unfinished(u) for u in group)
+            return
+        if (page or {}).get("timed_out") or (left is not None and left <= 0):
+            with futures_lock:
+                failed.extend(_failed(u, "deadline_exceeded") for u in group)
+            return
+        # satu ekstraksi per artikel kanonik (URL pertama jadi wakil), hasil disalin ke varian lain
+        rep = group[0]
+        err = resolved.get(rep, (rep, None))[1]
+        try:
+            fut = pool.submit(_extract_worker, rep, user_agent, landed if html else final_url, html, err,
+                              left, deadline)
+        except Exception as e:
+            with futures_lock:
+                failed.extend(_failed(u, f"executor: {e}") for u in group)
+            return
+        with futures_lock:
+            futures[fut] = group
+
+    download_pages(list(by_final), user_agent, on_page=_on_page, url_budget=url_budget, deadline=deadline)
+
+    out: List[Dict] = list(finished) + unfinished
+    with checkpoint_writer(job_id) as record:
+        for res in failed:
+            record(res)
+            out.append(res)
+        collected = set()
+        try:
+            timeout = max(0.0, deadline - time.time()) if deadline is not None else None
+            for fut in as_completed(futures, timeout=timeout):
+                group = futures[fut]
+                collected.add(fut)
+                try:
+                    res = fut.result()
+                except BrokenProcessPool as e:
+                    _reset_extract_pool()
+                    res = _failed(group[0], f"executor: {e}")
+                except Exception as e:
+                    res = _failed(group[0], f"executor: {e}")
+                for u in group:
+                    member = res if u == res.get("url") else dict(res, url=u)
+                    record(member)  # checkpoint per URL
+                    out.append(member)
+        except FuturesTimeout:
+            # straggler: yang masih antre dibatalkan; yang sedang jalan berhenti sendiri
+            # pada deadline yang sama (hasilnya diabaikan)
+            for fut, group in futures.items():
+                if fut not in collected:
+                    fut.cancel()
+                    out.extend(_unfinished(u) for u in group)
     return out
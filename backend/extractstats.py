@@ -0,0 +1,146 @@
+# backend/extractstats.py
+"""
+Statistik extractor per domain (persisten di news.db).
+Per (domain, langkah cascade) dicatat: jumlah percobaan, sukses, dan total
+waktu. extractor_order() memakai statistik itu untuk mengurutkan ulang
+cascade per publisher: jalur cepat (structured/template) tetap di depan
+selama tidak gagal berulang, sisanya menurut perkiraan biaya per sukses
+(rata-rata ms / rasio sukses ter-smoothing), dan langkah yang tidak pernah
+berhasil setelah SKIP_MIN_ATTEMPTS percobaan dilewati. Sesekali
+(EXPLORE_RATE) urutan bawaan dipakai utuh agar statistik tetap segar.
+"""
+import random
+import threading
+import time
+import urllib.parse
+from contextlib import closing
+from typing import Dict, List, Optional, Tuple
+
+from backend.utils import open_db
+
+SKIP_MIN_ATTEMPTS = 8
+FAST_STEPS = ("structured", "template")
+FAST_MIN_RATE = 0.25  # rasio ter-smoothing; 0 sukses dari 3 percobaan → 0.2 (turun dari depan)
+COST_FLOOR_MS = 20.0  # biaya minimum per langkah, agar langkah "instan" tidak selalu menang
+EXPLORE_RATE = 0.05
+CACHE_TTL = 60.0  # detik; statistik per domain di-cache di memori proses
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS extractor_stats (
+    domain TEXT NOT NULL,
+    extractor TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    successes INTEGER NOT NULL DEFAULT 0,
+    total_ms REAL NOT NULL DEFAULT 0,
+    last_success_at REAL,
+    PRIMARY KEY (domain, extractor)
+);
+"""
+
+_cache: Dict[str, Tuple[float, Dict[str, Dict]]] = {}
+_cache_lock = threading.Lock()
+
+
+def _connect():
+    conn = open_db()
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def domain_of(url: Optional[str]) -> str:
+    """Domain publisher (tanpa www./m.) untuk kunci statistik."""
+    host = urllib.parse.urlparse(url or "").netloc.lower().split(":")[0]
+    for prefix in ("www.", "m.", "amp."):
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+    return host
+
+
+def domain_stats(domain: str) -> Dict[str, Dict]:
+    """{extractor: {attempts, successes, total_ms, last_success_at}} untuk satu domain."""
+    now = time.monotonic()
+    with _cache_lock:
+        hit = _cache.get(domain)
+    if hit and now - hit[0] < CACHE_TTL:
+        return hit[1]
+    stats: Dict[str, Dict] = {}
+    try:
+        with closing(_connect()) as conn:
+            for name, att, succ, ms, last in conn.execute(
+                "SELECT extractor, attempts, successes, total_ms, last_success_at "
+                "FROM extractor_stats WHERE domain = ?", (domain,),
+            ):
+                stats[name] = {"attempts": att, "successes": succ, "total_ms": ms, "last_success_at": last}
+    except Exception:
+        pass
+    with _cache_lock:
+        _cache[domain] = (now, stats)
+    return stats
+
+
+def _success_rate(s: Optional[Dict]) -> float:
+    """Rasio sukses ter-smoothing (s+1)/(a+2): 0.5 tanpa data, satu hasil tidak mengunci urutan."""
+    if not s:
+        return 0.5
+    return (s["successes"] + 1) / (s["attempts"] + 2)
+
+
+def extractor_order(domain: str, default: List[str]) -> List[str]:
+    """
+    Urutan langkah cascade untuk domain.
+    - FAST_STEPS (structured/template: murah & tervalidasi) tetap di depan kecuali
+      rasio suksesnya di domain ini turun di bawah FAST_MIN_RATE (gagal berulang)
+    - sisanya diurutkan menurut perkiraan biaya per sukses: avg_ms / rasio sukses;
+      langkah yang belum pernah dicoba netral (rasio 0.5, biaya = langkah terlambat
+      yang tercatat) sehingga tidak melompati langkah yang terbukti berhasil
+    - langkah yang tidak pernah berhasil setelah SKIP_MIN_ATTEMPTS percobaan dilewati
+    """
+    stats = domain_stats(domain) if domain else {}
+    if not stats or random.random() < EXPLORE_RATE:
+        return list(default)
+
+    def _skip(name: str) -> bool:
+        s = stats.get(name)
+        return bool(s) and s["attempts"] >= SKIP_MIN_ATTEMPTS and s["successes"] == 0
+
+    def _avg_ms(name: str) -> Optional[float]:
+        s = stats.get(name)
+        return s["total_ms"] / s["attempts"] if s and s["attempts"] else None
+
+    kept = [n for n in default if not _skip(n)] or list(default)
+    fast = [n for n in kept if n in FAST_STEPS and _success_rate(stats.get(n)) >= FAST_MIN_RATE]
+    rest = [n for n in kept if n not in fast]
+    known_ms = [ms for ms in map(_avg_ms, rest) if ms is not None]
+    neutral_ms = max(known_ms) if known_ms else 0.0
+
+    def _cost(name: str):
+        ms = _avg_ms(name)
+        ms = neutral_ms if ms is None else ms
+        return ((ms + COST_FLOOR_MS) / _success_rate(stats.get(name)), default.index(name))
+
+    return fast + sorted(rest, key=_cost)
+
+
+def record_outcomes(domain: str, outcomes: List[Tuple[str, bool, float]]) -> None:
+    """Catat hasil langkah cascade satu artikel: [(extractor, sukses?, durasi_ms)]."""
+    if not domain or not outcomes:
+        return
+    now = time.time()
+    rows = [(domain, name, int(ok), ms, now if ok else None) for name, ok, ms in outcomes]
+    try:
+        with closing(_connect()) as conn, conn:
+            conn.executemany(
+                "INSERT INTO extractor_stats (domain, extractor, attempts, successes, total_ms, last_success_at) "
+                "VALUES (?, ?, 1, ?, ?, ?) "
+                "ON CONFLICT(domain, extractor) DO UPDATE SET "
+                "attempts = attempts + 1, "
+                "successes = successes + excluded.successes, "
+                "total_ms = total_ms + excluded.total_ms, "
+                "last_success_at = COALESCE(excluded.last_success_at, last_success_at)",
+                rows,
+            )
+    except Exception:
+        return
+    with _cache_lock:
+        _cache.pop(domain, None)
+
@@ -0,0 +1,49 @@
+# backend/feedcache.py
+"""
+State cache per-feed persisten untuk conditional GET.
+Tiap feed disimpan sebagai {etag, modified, entries}; backend.feedfetch
+mengirim If-None-Match / If-Modified-Since dari state ini, dan saat server
+membalas 304 entri hasil parse sebelumnya dipakai ulang (tanpa unduh & parse XML lagi).
+"""
+import hashlib
+import os
+import pickle
+import tempfile
+import time
+from typing import Dict, List, Optional
+
+from backend.utils import cache_dir
+
+
+def _cache_file(url: str) -> str:
+    name = hashlib.sha1(url.encode("utf-8")).hexdigest() + ".pkl"
+    return os.path.join(cache_dir("feeds"), name)
+
+
+def load_feed_cache(url: str) -> Optional[Dict]:
+    """Baca state cache satu feed; None bila belum ada / rusak."""
+    try:
+        with open(_cache_file(url), "rb") as f:
+            return pickle.load(f)
+    except Exception:
+        return None
+
+
+def save_feed_cache(url: str, etag: Optional[str], modified: Optional[str], entries: List) -> None:
+    """Tulis state cache secara atomik (tmp file → rename)."""
+    state = {
+        "url": url,
+        "etag": etag,
+        "modified": modified,
+        "entries": list(entries),
+        "fetched_at": time.time(),
+    }
+    path = _cache_file(url)
+    try:
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, path)
+    except Exception:
+        pass
+
@@ -0,0 +1,199 @@
+# backend/feedfetch.py
+"""
+Pengunduh feed berbasis asyncio (httpx).
+- semua feed diunduh bersamaan, dibatasi semaphore per-host
+- satu AsyncClient → koneksi keep-alive dipakai ulang per host
+- conditional GET memakai state dari backend.feedcache
+- byte hasil unduhan di-parse feedparser di thread terpisah begitu tiba
+- iter_feeds: varian streaming, hasil per feed di-yield begitu selesai
+- feed yang terus gagal di-circuit-break via backend.feedhealth
+"""
+import asyncio
+import queue
+import threading
+import time
+import urllib.parse
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+import feedparser
+import httpx
+
+from backend.feedcache import load_feed_cache, save_feed_cache
+from backend.feedhealth import FeedHealthRegistry, load_registry
+from backend.utils import entry_timestamp, run_async
+
+FEED_UA = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
+)
+
+try:  # HTTP/2 hanya bila paket h2 terpasang
+    import h2  # noqa: F401
+    _HTTP2 = True
+except ImportError:
+    _HTTP2 = False
+
+
+def _host(url: str) -> str:
+    return urllib.parse.urlparse(url).netloc.lower()
+
+
+def _conditional_headers(cached: Dict) -> Dict[str, str]:
+    headers = {}
+    if cached.get("etag"):
+        headers["If-None-Match"] = cached["etag"]
+    if cached.get("modified"):
+        headers["If-Modified-Since"] = cached["modified"]
+    return headers
+
+
+async def _fetch_one(
+    client: httpx.AsyncClient,
+    sem: asyncio.Semaphore,
+    url: str,
+    conditional: bool = True,
+    health: Optional[FeedHealthRegistry] = None,
+) -> Optional[List]:
+    """Unduh + parse satu feed; fallback ke entri cache bila gagal / circuit terbuka."""
+    cached = (load_feed_cache(url) or {}) if conditional else {}
+    if health is not None and not health.allow(url):
+        return cached.get("entries")
+
+    def _fail(status: Optional[int] = None, latency_ms: Optional[float] = None,
+              parse_error: bool = False, error: Optional[str] = None):
+        if health is not None:
+            health.record(url, ok=False, status=status, latency_ms=latency_ms,
+                          parse_error=parse_error, error=error)
+        return cached.get("entries")
+
+    try:
+        async with sem:
+            t0 = time.perf_counter()
+            r = await client.get(url, headers=_conditional_headers(cached))
+            latency_ms = (time.perf_counter() - t0) * 1000
+    except Exception as e:
+        return _fail(error=f"{type(e).__name__}: {e}")
+
+    if r.status_code == 304 and cached:
+        if health is not None:
+            health.record(url, ok=True, status=304, latency_ms=latency_ms,
+                          entry_count=len(cached.get("entries") or []))
+        return cached.get("entries", [])
+    if r.status_code >= 400:
+        return _fail(status=r.status_code, latency_ms=latency_ms, error=f"HTTP {r.status_code}")
+
+    try:
+        feed = await asyncio.to_thread(
+            feedparser.parse, r.content, response_headers=dict(r.headers)
+        )
+    except Exception as e:
+        return _fail(status=r.status_code, latency_ms=latency_ms, parse_error=True, error=str(e))
+
+    if not feed.entries and feed.get("bozo"):
+        return _fail(status=r.status_code, latency_ms=latency_ms, parse_error=True,
+                     error=str(feed.get("bozo_exception") or "parse error"))
+
+    if health is not None:
+        stamps = [ts for ts in (entry_timestamp(e) for e in feed.entries) if ts is not None]
+        health.record(url, ok=True, status=r.status_code, latency_ms=latency_ms,
+                      entry_count=len(feed.entries), newest_ts=max(stamps) if stamps else None)
+
+    if feed.entries:
+        if conditional:
+            save_feed_cache(url, r.headers.get("etag"), r.headers.get("last-modified"), feed.entries)
+        return feed.entries
+    return cached.get("entries") if conditional else feed.entries
+
+
+async def _fetch_all(
+    urls: List[str],
+    per_host: int,
+    max_connections: int,
+    timeout: float,
+    conditional: bool = True,
+    on_result: Optional[Callable[[str, Optional[List]], None]] = None,
+) -> Dict[str, Optional[List]]:
+    # kesehatan/circuit breaker hanya untuk feed tetap (bukan query ad-hoc)
+    health = load_registry() if conditional else None
+    sems: Dict[str, asyncio.Semaphore] = {}
+    for u in urls:
+        sems.setdefault(_host(u), asyncio.Semaphore(per_host))
+
+    limits = httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+    async with httpx.AsyncClient(
+        http2=_HTTP2,
+        limits=limits,
+        timeout=httpx.Timeout(timeout),
+        follow_redirects=True,
+        headers={"User-Agent": FEED_UA, "Accept": "application/rss+xml, application/xml;q=0.9, */*;q=0.8"},
+    ) as client:
+        async def _one(u: str) -> Optional[List]:
+            try:
+                res = await _fetch_one(client, sems[_host(u)], u, conditional, health)
+            except Exception:
+                res = None
+            if on_result is not None:
+                on_result(u, res)
+            return res
+
+        try:
+            results = await asyncio.gather(*(_one(u) for u in urls))
+        finally:
+            if health is not None:
+                await asyncio.to_thread(health.flush)
+    return dict(zip(urls, results))
+
+
+def fetch_feeds(
+    feeds: List[Tuple[str, str]],
+    per_host: int = 2,
+    max_connections: int = 64,
+    timeout: float = 15.0,
+    conditional: bool = True,
+) -> List[Tuple[str, str, Optional[List]]]:
+    """
+    Unduh semua (source, url) secara konkuren.
+    URL yang sama hanya diunduh sekali walau muncul di beberapa source.
+    conditional=False → tanpa ETag/Last-Modified & tanpa cache per-feed di disk.
+    Returns: [(source, url, entries | None)]
+    """
+    urls = list(dict.fromkeys(u for _, u in feeds))
+    by_url = run_async(_fetch_all(urls, per_host, max_connections, timeout, conditional))
+    return [(src, url, by_url.get(url)) for src, url in feeds]
+
+
+def iter_feeds(
+    feeds: List[Tuple[str, str]],
+    per_host: int = 2,
+    max_connections: int = 64,
+    timeout: float = 15.0,
+    conditional: bool = True,
+) -> Iterator[Tuple[str, str, Optional[List]]]:
+    """
+    Seperti fetch_feeds, tapi yield (source, url, entries) begitu tiap feed selesai.
+    Event loop berjalan di thread latar; hasil dialirkan lewat queue.
+    """
+    srcs_by_url: Dict[str, List[str]] = {}
+    for src, url in feeds:
+        srcs_by_url.setdefault(url, []).append(src)
+
+    q: "queue.Queue" = queue.Queue()
+    done = object()
+
+    def _runner():
+        try:
+            run_async(_fetch_all(
+                list(srcs_by_url), per_host, max_connections, timeout, conditional,
+                on_result=lambda u, res: q.put((u, res)),
+            ))
+        finally:
+            q.put(done)
+
+    threading.Thread(target=_runner, name="feed-fetch", daemon=True).start()
+    while True:
+        item = q.get()
+        if item is done:
+            return
+        url, entries = item
+        for src in srcs_by_url.get(url, []):
+            yield src, url, entries
@@ -0,0 +1,187 @@
+# backend/feedhealth.py
+"""
+Registry kesehatan feed + circuit breaker.
+
+Per URL feed dicatat: latency (terakhir & rata-rata EWMA), HTTP status,
+parse error, jumlah entri, waktu item terbaru, dan kegagalan beruntun.
+Setelah FAIL_THRESHOLD kegagalan beruntun, circuit dibuka: feed dilewati
+(pakai entri cache bila ada) sampai cooldown habis, lalu satu percobaan
+half-open. Sukses → tertutup lagi; gagal → terbuka dengan cooldown 2x.
+"""
+import threading
+import time
+from contextlib import closing
+from typing import Dict, List, Optional
+
+from backend.utils import open_db
+
+FAIL_THRESHOLD = 3
+BASE_COOLDOWN = 10 * 60
+MAX_COOLDOWN = 6 * 60 * 60
+EWMA_ALPHA = 0.3
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS feed_health (
+    url TEXT PRIMARY KEY,
+    state TEXT,
+    consecutive_failures INTEGER,
+    cooldown REAL,
+    opened_at REAL,
+    last_status INTEGER,
+    last_latency_ms REAL,
+    avg_latency_ms REAL,
+    last_entry_count INTEGER,
+    parse_errors INTEGER,
+    total_requests INTEGER,
+    total_failures INTEGER,
+    last_new_item_ts REAL,
+    last_success_at REAL,
+    last_checked_at REAL,
+    last_error TEXT
+);
+"""
+
+_COLUMNS = [
+    "url", "state", "consecutive_failures", "cooldown", "opened_at", "last_status",
+    "last_latency_ms", "avg_latency_ms", "last_entry_count", "parse_errors",
+    "total_requests", "total_failures", "last_new_item_ts", "last_success_at",
+    "last_checked_at", "last_error",
+]
+
+
+def _connect():
+    conn = open_db()
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _blank(url: str) -> Dict:
+    return {
+        "url": url, "state": CLOSED, "consecutive_failures": 0, "cooldown": BASE_COOLDOWN,
+        "opened_at": None, "last_status": None, "last_latency_ms": None, "avg_latency_ms": None,
+        "last_entry_count": None, "parse_errors": 0, "total_requests": 0, "total_failures": 0,
+        "last_new_item_ts": None, "last_success_at": None, "last_checked_at": None,
+        "last_error": None,
+    }
+
+
+class FeedHealthRegistry:
+    """Snapshot state kesehatan di memori; flush() menulis perubahan dalam satu transaksi."""
+
+    def __init__(self, stats: Dict[str, Dict]):
+        self._stats = stats
+        self._dirty = set()
+        self._lock = threading.Lock()
+
+    def _get(self, url: str) -> Dict:
+        stat = self._stats.get(url)
+        if stat is None:
+            stat = self._stats[url] = _blank(url)
+        return stat
+
+    def allow(self, url: str) -> bool:
+        """Boleh request? OPEN → tolak sampai cooldown habis, lalu satu percobaan HALF_OPEN."""
+        with self._lock:
+            stat = self._get(url)
+            if stat["state"] == CLOSED:
+                return True
+            now = time.time()
+            if now - (stat["opened_at"] or 0) >= (stat["cooldown"] or BASE_COOLDOWN):
+                # percobaan half-open; opened_at digeser agar percobaan yang macet bisa diulang
+                stat["state"] = HALF_OPEN
+                stat["opened_at"] = now
+                self._dirty.add(url)
+                return True
+            return False
+
+    def record(
+        self,
+        url: str,
+        ok: bool,
+        status: Optional[int] = None,
+        latency_ms: Optional[float] = None,
+        entry_count: Optional[int] = None,
+        parse_error: bool = False,
+        newest_ts: Optional[float] = None,
+        error: Optional[str] = None,
+    ) -> None:
+        now = time.time()
+        with self._lock:
+            stat = self._get(url)
+            stat["last_checked_at"] = now
+            stat["total_requests"] = (stat["total_requests"] or 0) + 1
+            stat["last_status"] = status
+            if latency_ms is not None:
+                stat["last_latency_ms"] = latency_ms
+                prev = stat["avg_latency_ms"]
+                stat["avg_latency_ms"] = latency_ms if prev is None else (
+                    EWMA_ALPHA * latency_ms + (1 - EWMA_ALPHA) * prev
+                )
+            if entry_count is not None:
+                stat["last_entry_count"] = entry_count
+            if parse_error:
+                stat["parse_errors"] = (stat["parse_errors"] or 0) + 1
+            if newest_ts is not None and newest_ts > (stat["last_new_item_ts"] or 0):
+                stat["last_new_item_ts"] = newest_ts
+
+            if ok:
+                stat["state"] = CLOSED
+                stat["consecutive_failures"] = 0
+                stat["cooldown"] = BASE_COOLDOWN
+                stat["last_success_at"] = now
+                stat["last_error"] = None
+            else:
+                stat["total_failures"] = (stat["total_failures"] or 0) + 1
+                stat["consecutive_failures"] = (stat["consecutive_failures"] or 0) + 1
+                stat["last_error"] = (error or "")[:200] or None
+                if stat["state"] == HALF_OPEN:
+                    stat["state"] = OPEN
+                    stat["opened_at"] = now
+                    stat["cooldown"] = min(MAX_COOLDOWN, (stat["cooldown"] or BASE_COOLDOWN) * 2)
+                elif stat["consecutive_failures"] >= FAIL_THRESHOLD:
+                    stat["state"] = OPEN
+                    stat["opened_at"] = now
+            self._dirty.add(url)
+
+    def snapshot(self) -> List[Dict]:
+        with self._lock:
+            return [dict(v) for v in self._stats.values()]
+
+    def flush(self) -> None:
+        with self._lock:
+            rows = [tuple(self._stats[u][c] for c in _COLUMNS) for u in self._dirty]
+            self._dirty.clear()
+        if not rows:
+            return
+        try:
+            with closing(_connect()) as conn, conn:
+                conn.executemany(
+                    f"INSERT OR REPLACE INTO feed_health ({', '.join(_COLUMNS)}) "
+                    f"VALUES ({', '.join('?' * len(_COLUMNS))})",
+                    rows,
+                )
+        except Exception:
+            pass
+
+
+def load_registry() -> FeedHealthRegistry:
+    """Muat state kesehatan semua feed dari DB (kosong bila gagal)."""
+    stats: Dict[str, Dict] = {}
+    try:
+        with closing(_connect()) as conn:
+            for row in conn.execute(f"SELECT {', '.join(_COLUMNS)} FROM feed_health"):
+                stats[row[0]] = dict(zip(_COLUMNS, row))
+    except Exception:
+        pass
+    return FeedHealthRegistry(stats)
+
+
+def feed_health_stats() -> List[Dict]:
+    """Statistik per feed, urut dari yang paling mahal (rata-rata latency tertinggi)."""
+    return sorted(
+        load_registry().snapshot(),
+        key=lambda s: (s["state"] != CLOSED, s["avg_latency_ms"] or 0.0),
+        reverse=True,
+    )
@@ -0,0 +1,263 @@
+# backend/gnewsdecode.py
+"""
+Resolver URL Google News (/articles/<id>, /rss/articles/<id>) → URL publisher.
+- parameter decoding (signature, timestamp) diambil konkuren; atributnya
+  dibaca via regex, BeautifulSoup hanya sebagai fallback
+- decode lewat batchexecute dalam batch besar (BATCH_SIZE artikel per request)
+- pemetaan gn_art_id → URL publisher disimpan permanen di SQLite, sehingga
+  tiap artikel cukup di-resolve sekali
+"""
+import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from typing import Dict, Iterable, List, Optional, Set
+from urllib.parse import quote, urlparse
+
+import requests
+from bs4 import BeautifulSoup
+
+from backend.utils import open_db
+
+BATCH_SIZE = 40
+BATCHEXECUTE_URL = "https://news.google.com/_/DotsSplashUi/data/batchexecute"
+
+_SIG_RE = re.compile(r'data-n-a-sg="([^"]+)"')
+_TS_RE = re.compile(r'data-n-a-ts="([^"]+)"')
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS gnews_urls (
+    gn_art_id TEXT PRIMARY KEY,
+    url TEXT NOT NULL,
+    resolved_at REAL
+);
+"""
+
+
+def _connect():
+    conn = open_db()
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def gn_art_id(url: str) -> Optional[str]:
+    """ID artikel Google News dari URL (None bila bukan URL artikel Google News)."""
+    if not url or "news.google.com" not in url:
+        return None
+    parts = urlparse(url).path.split("/")
+    for marker in ("articles", "read"):
+        if marker in parts:
+            idx = parts.index(marker)
+            if idx + 1 < len(parts) and parts[idx + 1]:
+                return parts[idx + 1]
+    return None
+
+
+def lookup_gnews_urls(ids: Iterable[str]) -> Dict[str, str]:
+    """gn_art_id → URL publisher untuk ID yang sudah pernah di-resolve."""
+    ids = list(dict.fromkeys(i for i in ids if i))
+    found: Dict[str, str] = {}
+    if not ids:
+        return found
+    try:
+        with closing(_connect()) as conn:
+            for i in range(0, len(ids), 500):
+                chunk = ids[i:i + 500]
+                rows = conn.execute(
+                    f"SELECT gn_art_id, url FROM gnews_urls WHERE gn_art_id IN ({', '.join('?' * len(chunk))})",
+                    chunk,
+                )
+                found.update(dict(rows))
+    except Exception:
+        pass
+    return found
+
+
+def store_gnews_urls(mapping: Dict[str, str]) -> None:
+    if not mapping:
+        return
+    now = time.time()
+    try:
+        with closing(_connect()) as conn, conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO gnews_urls (gn_art_id, url, resolved_at) VALUES (?, ?, ?)",
+                [(k, v, now) for k, v in mapping.items()],
+            )
+    except Exception:
+        pass
+
+
+def _timeout(default: float, deadline: Optional[float]) -> Optional[float]:
+    """Timeout request dipotong ke sisa waktu sebelum deadline (None = deadline lewat)."""
+    if deadline is None:
+        return default
+    left = deadline - time.time()
+    return min(default, left) if left > 0 else None
+
+
+def get_decoding_params(gn_art_id: str, session: requests.Session, deadline: Optional[float] = None) -> Dict:
+    """
+    Ambil parameter decoding (signature, timestamp) dari Google News article.
+    Fallback: coba /articles dulu, kalau gagal coba /rss/articles
+    deadline (epoch): timeout tiap request dipotong ke sisa waktu.
+    """
+    urls_to_try = [
+        f"https://news.google.com/articles/{gn_art_id}",
+        f"https://news.google.com/rss/articles/{gn_art_id}"
+    ]
+
+    for url in urls_to_try:
+        timeout = _timeout(10, deadline)
+        if timeout is None:
+            break
+        try:
+            response = session.get(url, timeout=timeout)
+            if not response.ok:
+                continue
+
+            text = response.text
+            m_sig, m_ts = _SIG_RE.search(text), _TS_RE.search(text)
+            if m_sig and m_ts:
+                signature, timestamp = m_sig.group(1), m_ts.group(1)
+            else:
+                div = BeautifulSoup(text, "html.parser").select_one("c-wiz > div")
+                if not div:
+                    continue
+                signature = div.get("data-n-a-sg")
+                timestamp = div.get("data-n-a-ts")
+
+            if signature and timestamp:
+                return {
+                    "signature": signature,
+                    "timestamp": timestamp,
+                    "gn_art_id": gn_art_id,
+                }
+        except Exception:
+            continue
+
+    raise ValueError(f"Cannot get decoding params for {gn_art_id}")
+
+
+def decode_google_news_batch(
+    articles: List[Dict], session: requests.Session, deadline: Optional[float] = None,
+) -> List[Optional[str]]:
+    """
+    Decode multiple Google News URLs menggunakan batchexecute API.
+    Articles format: [{"signature": "...", "timestamp": "...", "gn_art_id": "..."}]
+    deadline (epoch): timeout request dipotong ke sisa waktu (lewat → ValueError).
+    Tiap request diberi tag "1", "2", ... dan respons dicocokkan hanya lewat tag itu.
+    Returns: URL hasil decode, sejajar dengan articles (None bila gagal / tanpa tag)
+    """
+    articles_reqs = [
+        [
+            "Fbv4je",
+            f'["garturlreq",[[\"X\",\"X\",[\"X\",\"X\"],null,null,1,1,\"US:en\",null,1,null,null,null,null,null,0,1],\"X\",\"X\",1,[1,1,1],1,1,null,0,0,null,0],"{art["gn_art_id"]}",{art["timestamp"]},"{art["signature"]}"]',
+            None,
+            str(i + 1),  # tag request: dikembalikan di envelope respons
+        ]
+        for i, art in enumerate(articles)
+    ]
+
+    payload = f"f.req={quote(json.dumps([articles_reqs]))}"
+    headers = {
+        "Content-Type": "application/x-www-form-urlencoded;charset=UTF-8",
+        "Referer": "https://news.google.com/"
+    }
+
+    timeout = _timeout(20, deadline)
+    if timeout is None:
+        raise ValueError("Batch decode skipped: deadline passed")
+    try:
+        response = session.post(
+            url=BATCHEXECUTE_URL,
+            headers=headers,
+            data=payload,
+            timeout=timeout
+        )
+        response.raise_for_status()
+
+        # Parse response
+        parts = response.text.split("\n\n")
+        if len(parts) < 2:
+            raise ValueError("Invalid batchexecute response")
+
+        decoded = json.loads(parts[1])
+    except Exception as e:
+        raise ValueError(f"Batch decode failed: {e}")
+
+    out: List[Optional[str]] = [None] * len(articles)
+    for res in decoded:
+        if not (isinstance(res, list) and len(res) > 2 and res[0] == "wrb.fr"):
+            continue
+        # cocokkan hanya lewat tag request; envelope tanpa tag dibuang (posisi tidak bisa
+        # dipercaya: satu error/envelope hilang menggeser semua indeks berikutnya)
+        tag = res[-1]
+        if not (isinstance(tag, str) and tag.isdigit()):
+            continue
+        idx = int(tag) - 1
+        try:
+            if 0 <= idx < len(out):
+                out[idx] = json.loads(res[2])[1]
+        except Exception:
+            continue
+    return out
+
+
+def resolve_gnews_batch(
+    urls: List[str],
+    session: requests.Session,
+    max_workers: int = 16,
+    batch_size: int = BATCH_SIZE,
+    deadline: Optional[float] = None,
+) -> Dict[str, Optional[str]]:
+    """
+    Resolve banyak URL Google News sekaligus.
+    1) cek pemetaan permanen (gn_art_id → URL)
+    2) sisanya: parameter decoding diambil konkuren
+    3) decode dalam batch besar via batchexecute, hasil disimpan permanen
+    deadline (epoch): timeout tiap request dipotong ke sisa waktu; id yang belum
+    selesai saat deadline lewat tidak dicoba lagi.
+    Returns: {url: URL publisher | None bila gagal / bukan URL artikel Google News};
+    URL yang tidak sempat di-resolve karena deadline TIDAK ada di dict.
+    """
+    ids = {u: gn_art_id(u) for u in urls}
+    known = lookup_gnews_urls(ids.values())
+    todo = sorted({i for i in ids.values() if i and i not in known})
+    skipped: Set[str] = set()  # id yang terpotong deadline (bukan gagal)
+
+    def _expired() -> bool:
+        return deadline is not None and time.time() >= deadline
+
+    def _params(art_id: str) -> Optional[Dict]:
+        if _expired():
+            skipped.add(art_id)
+            return None
+        try:
+            return get_decoding_params(art_id, session, deadline)
+        except ValueError:
+            if _expired():
+                skipped.add(art_id)
+            return None
+
+    def _decode(batch: List[Dict]):
+        try:
+            return batch, decode_google_news_batch(batch, session, deadline)
+        except ValueError:
+            if _expired():
+                skipped.update(art["gn_art_id"] for art in batch)
+            return batch, []
+
+    found: Dict[str, str] = {}
+    if todo:
+        with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(todo)))) as ex:
+            params = [p for p in ex.map(_params, todo) if p]
+            batches = [params[i:i + batch_size] for i in range(0, len(params), batch_size)]
+            for batch, decoded in ex.map(_decode, batches):
+                for art, dec in zip(batch, decoded):
+                    if dec and "news.google.com" not in dec:
+                        found[art["gn_art_id"]] = dec
+        store_gnews_urls(found)
+        known.update(found)
+
+    return {u: known.get(art_id) if art_id else None for u, art_id in ids.items() if art_id not in skipped}
@@ -0,0 +1,189 @@
+# backend/htmlcache.py
+"""
+Cache HTML artikel persisten di disk (SQLite terpisah: html.db).
+- key: clean_url(url) → URL yang sama dengan utm_*/fbclid/fragment berbagi entri
+  (varian AMP/mobile tetap entri sendiri: HTML-nya memang berbeda)
+- body dikompresi zstd (bila paket zstandard terpasang) atau gzip
+- TTL: entri lebih muda dari HTML_TTL dipakai tanpa request; entri basi
+  masih menyimpan ETag/Last-Modified untuk revalidasi (304 → pakai ulang)
+- batas ukuran total (LRU berdasarkan accessed_at)
+Dibaca oleh downloader, fetch_article, dan re-ekstraksi offline
+(get_cached_page(url, allow_stale=True)).
+"""
+import gzip
+import json
+import os
+import threading
+import time
+from contextlib import closing
+from typing import Dict, Optional
+
+from backend.utils import clean_url, open_db
+
+try:  # zstd lebih cepat & lebih kecil; gzip sebagai fallback
+    import zstandard
+    _ZSTD_C = zstandard.ZstdCompressor(level=6)
+    _ZSTD_D = zstandard.ZstdDecompressor()
+except ImportError:
+    zstandard = None
+
+HTML_TTL = float(os.getenv("NEWS_HTML_TTL", str(6 * 60 * 60)))       # detik; 0 → selalu revalidasi
+HTML_CACHE_MB = float(os.getenv("NEWS_HTML_CACHE_MB", "256"))        # 0 → cache nonaktif
+PRUNE_EVERY = 50                                                      # cek ukuran tiap N penulisan
+
+# header yang disimpan (revalidasi + info konten)
+KEEP_HEADERS = ("content-type", "etag", "last-modified", "cache-control", "date", "content-language")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS html_cache (
+    key TEXT PRIMARY KEY,
+    url TEXT,
+    final_url TEXT,
+    status INTEGER,
+    headers TEXT,
+    codec TEXT,
+    body BLOB,
+    size INTEGER,
+    fetched_at REAL,
+    accessed_at REAL
+);
+CREATE INDEX IF NOT EXISTS html_cache_accessed ON html_cache(accessed_at);
+"""
+
+_puts = 0
+_puts_lock = threading.Lock()
+
+
+def _connect():
+    conn = open_db("html.db")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _compress(text: str):
+    raw = text.encode("utf-8")
+    if zstandard is not None:
+        return "zstd", _ZSTD_C.compress(raw)
+    return "gzip", gzip.compress(raw, compresslevel=6)
+
+
+def _decompress(codec: str, body: bytes) -> str:
+    if codec == "zstd":
+        if zstandard is None:
+            raise ValueError("zstandard tidak terpasang")
+        raw = _ZSTD_D.decompress(body)
+    else:
+        raw = gzip.decompress(body)
+    return raw.decode("utf-8")
+
+
+def enabled() -> bool:
+    return HTML_CACHE_MB > 0
+
+
+def get_cached_page(url: str, allow_stale: bool = False) -> Optional[Dict]:
+    """
+    Entri cache untuk url: {url, final_url, status, headers, html, fetched_at, fresh}.
+    allow_stale=False → None bila lebih tua dari HTML_TTL.
+    """
+    if not enabled() or not url:
+        return None
+    key = clean_url(url)
+    try:
+        with closing(_connect()) as conn:
+            row = conn.execute(
+                "SELECT url, final_url, status, headers, codec, body, fetched_at "
+                "FROM html_cache WHERE key = ?", (key,),
+            ).fetchone()
+            if row is None:
+                return None
+            fresh = (time.time() - (row[6] or 0)) < HTML_TTL
+            if not fresh and not allow_stale:
+                return None
+            with conn:
+                conn.execute("UPDATE html_cache SET accessed_at = ? WHERE key = ?", (time.time(), key))
+        html = _decompress(row[4], row[5])
+    except Exception:
+        return None
+    return {
+        "url": row[0],
+        "final_url": row[1],
+        "status": row[2],
+        "headers": json.loads(row[3] or "{}"),
+        "html": html,
+        "fetched_at": row[6],
+        "fresh": fresh,
+    }
+
+
+def revalidation_headers(entry: Optional[Dict]) -> Dict[str, str]:
+    """If-None-Match / If-Modified-Since dari header entri cache."""
+    headers = {}
+    stored = (entry or {}).get("headers") or {}
+    if stored.get("etag"):
+        headers["If-None-Match"] = stored["etag"]
+    if stored.get("last-modified"):
+        headers["If-Modified-Since"] = stored["last-modified"]
+    return headers
+
+
+def put_cached_page(url: str, final_url: Optional[str], status: int, headers, html: str) -> None:
+    """Simpan halaman HTML (hanya respons sukses) secara terkompresi."""
+    global _puts
+    if not enabled() or not url or not html or not (200 <= (status or 0) < 300):
+        return
+    kept = {k: v for k, v in ((k.lower(), v) for k, v in dict(headers or {}).items()) if k in KEEP_HEADERS}
+    now = time.time()
+    try:
+        codec, body = _compress(html)
+        with closing(_connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO html_cache "
+                "(key, url, final_url, status, headers, codec, body, size, fetched_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (clean_url(url), url, final_url or url, status, json.dumps(kept),
+                 codec, body, len(body), now, now),
+            )
+    except Exception:
+        return
+    with _puts_lock:
+        _puts += 1
+        due = _puts % PRUNE_EVERY == 0
+    if due:
+        prune()
+
+
+def touch_cached_page(url: str) -> None:
+    """Revalidasi berhasil (304) → entri dianggap segar lagi."""
+    if not enabled():
+        return
+    now = time.time()
+    try:
+        with closing(_connect()) as conn, conn:
+            conn.execute(
+                "UPDATE html_cache SET fetched_at = ?, accessed_at = ? WHERE key = ?",
+                (now, now, clean_url(url)),
+            )
+    except Exception:
+        pass
+
+
+def prune(max_bytes: Optional[float] = None) -> int:
+    """Hapus entri yang paling lama tidak diakses sampai total ≤ 90% batas. Returns jumlah terhapus."""
+    limit = (HTML_CACHE_MB * 1024 * 1024) if max_bytes is None else max_bytes
+    try:
+        with closing(_connect()) as conn, conn:
+            total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM html_cache").fetchone()[0]
+            if total <= limit:
+                return 0
+            excess = total - 0.9 * limit
+            victims, freed = [], 0
+            for key, size in conn.execute("SELECT key, size FROM html_cache ORDER BY accessed_at"):
+                victims.append((key,))
+                freed += size or 0
+                if freed >= excess:
+                    break
+            conn.executemany("DELETE FROM html_cache WHERE key = ?", victims)
+            return len(victims)
+    except Exception:
+        return 0
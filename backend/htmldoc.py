@@ -0,0 +1,111 @@
+# backend/htmldoc.py
+"""
+Dokumen HTML yang di-decode & di-parse sekali per halaman.
+Semua pembaca dalam fetch_article (template publisher, trafilatura teks +
+metadata, link canonical/AMP) memakai pohon lxml yang sama, dan hasil
+ekstraksi trafilatura (teks + metadata dalam satu pass) di-memoize.
+readability/boilerpy3/jusText hanya menerima string, jadi tetap memakai .html.
+"""
+import re
+from copy import copy
+from typing import Dict, Optional, Tuple, Union
+
+import trafilatura
+from trafilatura.utils import decode_file, load_html
+
+_AMP_RE = re.compile(r'<link[^>]+rel=["\']amphtml["\'][^>]+href=["\']([^"\']+)["\']', re.I)
+_CANON_RE = re.compile(r'<link[^>]+rel=["\']canonical["\'][^>]+href=["\']([^"\']+)["\']', re.I)
+
+_UNSET = object()
+
+
+def _as_dict(doc) -> Dict:
+    if doc is None:
+        return {}
+    return doc.as_dict() if hasattr(doc, "as_dict") else dict(doc)
+
+
+class HtmlDocument:
+    """HTML satu halaman: string, pohon lxml, link, dan hasil trafilatura — semuanya lazy & sekali hitung."""
+
+    __slots__ = ("url", "html", "_tree", "_links", "_extraction", "_metadata")
+
+    def __init__(self, html: Union[str, bytes], url: Optional[str] = None):
+        self.url = url
+        # bytes → str sekali dengan deteksi charset trafilatura
+        self.html: str = decode_file(html) if isinstance(html, bytes) else (html or "")
+        self._tree = _UNSET
+        self._links: Optional[Tuple[Optional[str], Optional[str]]] = None
+        self._extraction: Optional[Dict] = None
+        self._metadata: Optional[Dict] = None
+
+    @property
+    def tree(self):
+        """Pohon lxml.html (None bila HTML tidak bisa di-parse)."""
+        if self._tree is _UNSET:
+            try:
+                self._tree = load_html(self.html) if self.html else None
+            except Exception:
+                self._tree = None
+        return self._tree
+
+    def links(self) -> Tuple[Optional[str], Optional[str]]:
+        """(amp_url, canonical_url) dari <link rel=...>."""
+        if self._links is None:
+            amp_url = canonical_url = None
+            tree = self.tree
+            if tree is not None:
+                for el in tree.iterfind(".//link"):
+                    rels = (el.get("rel") or "").lower().split()
+                    href = el.get("href")
+                    if not href:
+                        continue
+                    if amp_url is None and "amphtml" in rels:
+                        amp_url = href
+                    elif canonical_url is None and "canonical" in rels:
+                        canonical_url = href
+            else:
+                m_amp, m_canon = _AMP_RE.search(self.html), _CANON_RE.search(self.html)
+                amp_url = m_amp.group(1) if m_amp else None
+                canonical_url = m_canon.group(1) if m_canon else None
+            self._links = (amp_url, canonical_url)
+        return self._links
+
+    def extraction(self) -> Dict:
+        """trafilatura.bare_extraction (teks + metadata, satu pass) atas pohon yang sama."""
+        if self._extraction is None:
+            res: Dict = {}
+            tree = self.tree
+            if tree is not None:
+                try:
+                    # trafilatura menyalin pohon yang diberikan → self.tree tetap utuh
+                    res = _as_dict(trafilatura.bare_extraction(
+                        tree, url=self.url,
+                        include_comments=False,
+                        include_tables=False,
+                        with_metadata=True,
+                        favor_recall=True,
+                    ))
+                except Exception:
+                    res = {}
+            self._extraction = res
+        return self._extraction
+
+    def text(self) -> Optional[str]:
+        return self.extraction().get("text")
+
+    def metadata(self) -> Dict:
+        """{title, date, description}: dari extraction() bila sudah jalan, selain itu extract_metadata."""
+        if self._metadata is None:
+            if self._extraction is not None:
+                src = self._extraction
+            else:
+                src = {}
+                tree = self.tree
+                if tree is not None:
+                    try:
+                        src = _as_dict(trafilatura.metadata.extract_metadata(copy(tree), default_url=self.url))
+                    except Exception:
+                        src = {}
+            self._metadata = {k: src.get(k) for k in ("title", "date", "description")}
+        return self._metadata
@@ -0,0 +1,242 @@
+# backend/httpclient.py
+"""
+Klien HTTP bersama (satu per proses) untuk ekstraksi artikel.
+- requests.Session dengan pool koneksi per host + keep-alive → handshake
+  TCP/TLS cukup sekali per publisher, bukan sekali per artikel
+- dipakai resolver Google News, AMP cache, dan seluruh cascade extractor
+- cache DNS ber-TTL (LRU) di connection class urllib3 milik session ini saja,
+  agar host yang sama tidak di-resolve berulang (socket.getaddrinfo global utuh)
+- unduhan HTML streaming dengan batas ukuran + deteksi charset cepat
+  (header → <meta charset> di awal dokumen → detektor atas prefix saja)
+"""
+import codecs
+import os
+import re
+import socket
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+from urllib3.util import connection as urllib3_connection
+
+try:  # urllib3 >= 2
+    from urllib3.exceptions import NameResolutionError
+except ImportError:
+    NameResolutionError = None
+
+DEFAULT_UA = (
+    "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+    "(KHTML, like Gecko) Chrome/124.0.0.0 Safari/537.36"
+)
+
+DEFAULT_HEADERS = {
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "id-ID,id;q=0.9,en-US;q=0.8,en;q=0.7",
+    "Cache-Control": "no-cache",
+    "Pragma": "no-cache",
+    "Connection": "keep-alive",
+    "Referer": "https://news.google.com/",
+}
+
+POOL_HOSTS = int(os.getenv("NEWS_POOL_HOSTS", "64"))      # jumlah host yang pool-nya disimpan
+POOL_PER_HOST = int(os.getenv("NEWS_POOL_PER_HOST", "16"))  # koneksi keep-alive per host
+DNS_TTL = float(os.getenv("NEWS_DNS_TTL", "300"))          # 0 → cache DNS nonaktif
+DNS_CACHE_MAX = int(os.getenv("NEWS_DNS_CACHE_MAX", "1024"))  # jumlah host:port di cache DNS
+MAX_PAGE_BYTES = int(os.getenv("NEWS_MAX_PAGE_BYTES", str(5 * 1024 * 1024)))  # halaman lebih besar → batal
+
+META_SNIFF_BYTES = 4096       # <meta charset> dicari di awal dokumen saja
+DETECT_BYTES = 64 * 1024      # detektor charset hanya atas prefix
+CHUNK_BYTES = 64 * 1024
+
+# =========================
+# DNS cache (hanya untuk koneksi session modul ini)
+# =========================
+
+_dns_cache: "OrderedDict[Tuple[str, int], Tuple[float, List[Tuple]]]" = OrderedDict()
+_dns_lock = threading.Lock()
+
+
+def _resolve(host: str, port: int) -> List[Tuple]:
+    """Alamat (sockaddr) host:port dari cache ber-TTL (LRU, maks DNS_CACHE_MAX host)."""
+    key = (host, port)
+    now = time.monotonic()
+    with _dns_lock:
+        hit = _dns_cache.get(key)
+        if hit and now - hit[0] < DNS_TTL:
+            _dns_cache.move_to_end(key)
+            return hit[1]
+        if hit:
+            del _dns_cache[key]
+    infos = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+    addrs = list(dict.fromkeys(info[4][:2] for info in infos))
+    with _dns_lock:
+        _dns_cache[key] = (now, addrs)
+        for k in [k for k, (ts, _a) in _dns_cache.items() if now - ts >= DNS_TTL]:
+            del _dns_cache[k]
+        while len(_dns_cache) > DNS_CACHE_MAX:
+            _dns_cache.popitem(last=False)
+    return addrs
+
+
+class _CachedDNSMixin:
+    """_new_conn urllib3 dengan resolusi dari _resolve(); socket.getaddrinfo global tidak disentuh."""
+
+    def _new_conn(self):
+        try:
+            addrs = _resolve(self._dns_host, self.port)
+        except socket.gaierror as e:
+            if NameResolutionError is not None:
+                raise NameResolutionError(self.host, self, e) from e
+            raise NewConnectionError(self, f"Failed to resolve {self.host}: {e}") from e
+        err: Optional[Exception] = None
+        for addr in addrs:  # alamat IP numerik → create_connection tidak query DNS lagi
+            try:
+                return urllib3_connection.create_connection(
+                    addr, self.timeout, source_address=self.source_address, socket_options=self.socket_options,
+                )
+            except socket.timeout as e:
+                err = ConnectTimeoutError(self, f"Connection to {self.host} timed out. (connect timeout={self.timeout})")
+                err.__cause__ = e
+            except OSError as e:
+                err = NewConnectionError(self, f"Failed to establish a new connection: {e}")
+                err.__cause__ = e
+        raise err or NewConnectionError(self, f"No address for {self.host}")
+
+
+class _CachedDNSHTTPConnection(_CachedDNSMixin, HTTPConnection):
+    pass
+
+
+class _CachedDNSHTTPSConnection(_CachedDNSMixin, HTTPSConnection):
+    pass
+
+
+class _CachedDNSHTTPPool(HTTPConnectionPool):
+    ConnectionCls = _CachedDNSHTTPConnection
+
+
+class _CachedDNSHTTPSPool(HTTPSConnectionPool):
+    ConnectionCls = _CachedDNSHTTPSConnection
+
+
+class _CachedDNSAdapter(HTTPAdapter):
+    """HTTPAdapter yang pool-nya memakai cache DNS modul ini."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {"http": _CachedDNSHTTPPool, "https": _CachedDNSHTTPSPool}
+
+
+# =========================
+# Session bersama
+# =========================
+
+_sessions: Dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+
+def _build_session(user_agent: str) -> requests.Session:
+    s = requests.Session()
+    adapter_cls = _CachedDNSAdapter if DNS_TTL > 0 else HTTPAdapter
+    adapter = adapter_cls(pool_connections=POOL_HOSTS, pool_maxsize=POOL_PER_HOST, max_retries=0)
+    s.mount("https://", adapter)
+    s.mount("http://", adapter)
+    s.headers.update(DEFAULT_HEADERS)
+    s.headers["User-Agent"] = user_agent
+    return s
+
+
+def get_session(user_agent: Optional[str] = None) -> requests.Session:
+    """Session bersama per User-Agent (koneksi di-pool & dipakai ulang antar artikel)."""
+    ua = user_agent or DEFAULT_UA
+    s = _sessions.get(ua)
+    if s is None:
+        with _sessions_lock:
+            s = _sessions.get(ua)
+            if s is None:
+                s = _sessions[ua] = _build_session(ua)
+    return s
+
+
+# =========================
+# Body HTML: streaming + charset
+# =========================
+
+_HEADER_CHARSET_RE = re.compile(r"charset=[\"']?([\w.:-]+)", re.I)
+_META_CHARSET_RE = re.compile(rb"<meta[^>]+charset=[\"']?([\w.:-]+)", re.I)
+
+
+def _codec(name) -> Optional[str]:
+    if isinstance(name, bytes):
+        name = name.decode("ascii", "ignore")
+    try:
+        return codecs.lookup(name).name if name else None
+    except LookupError:
+        return None
+
+
+def is_html_type(content_type: Optional[str]) -> bool:
+    return "html" in (content_type or "").lower()
+
+
+def detect_charset(content_type: Optional[str], body: bytes) -> str:
+    """Charset body: header HTTP → <meta charset> di META_SNIFF_BYTES pertama → detektor atas prefix."""
+    m = _HEADER_CHARSET_RE.search(content_type or "")
+    enc = _codec(m.group(1)) if m else None
+    if enc:
+        return enc
+    m = _META_CHARSET_RE.search(body[:META_SNIFF_BYTES])
+    enc = _codec(m.group(1)) if m else None
+    if enc:
+        return enc
+    prefix = body[:DETECT_BYTES]
+    try:
+        # UTF-8 valid (karakter terpotong di ujung prefix diabaikan) → jalur tercepat
+        codecs.getincrementaldecoder("utf-8")().decode(prefix, final=False)
+        return "utf-8"
+    except UnicodeDecodeError:
+        pass
+    try:
+        from charset_normalizer import from_bytes
+        best = from_bytes(prefix).best()
+        if best and _codec(best.encoding):
+            return _codec(best.encoding)
+    except Exception:
+        pass
+    return "utf-8"
+
+
+def decode_html(body: bytes, content_type: Optional[str] = None) -> str:
+    return body.decode(detect_charset(content_type, body), errors="replace")
+
+
+def read_html(resp: requests.Response, max_bytes: int = MAX_PAGE_BYTES, deadline: Optional[float] = None) -> Optional[str]:
+    """
+    Baca body respons (session.get(..., stream=True)) → str.
+    None (koneksi ditutup lebih awal) bila bukan HTML, melebihi max_bytes, atau
+    deadline (epoch) lewat di tengah pembacaan (server yang menetes pelan).
+    """
+    ctype = resp.headers.get("Content-Type", "") or ""
+    length = resp.headers.get("Content-Length") or ""
+    if not is_html_type(ctype) or (length.isdigit() and int(length) > max_bytes):
+        resp.close()
+        return None
+    buf = bytearray()
+    try:
+        for chunk in resp.iter_content(CHUNK_BYTES):
+            buf += chunk
+            if len(buf) > max_bytes:
+                return None
+            if deadline is not None and time.time() > deadline:
+                return None
+    except Exception:
+        return None
+    finally:
+        resp.close()
+    return decode_html(bytes(buf), ctype)
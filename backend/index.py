@@ -0,0 +1,198 @@
+# backend/index.py
+"""
+Indeks full-text lokal (SQLite FTS5) untuk semua entri RSS yang pernah dilihat.
+Key = URL kanonik; kolom: title, desc, source, published (ISO) & published_ts (epoch).
+Dipakai search untuk menjawab query kata kunci + rentang tanggal tanpa crawl,
+dan menjangkau tanggal yang sudah keluar dari jendela feed.
+"""
+import threading
+import time
+from contextlib import closing
+from datetime import datetime, time as dtime
+from typing import Dict, Iterable, List, Optional
+
+from backend.utils import WIB, canonicalize, clean_html_desc, compile_keywords, entry_timestamp, open_db, ts_to_wib
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS articles (
+    url TEXT PRIMARY KEY,
+    link TEXT NOT NULL,
+    title TEXT,
+    desc TEXT,
+    source TEXT,
+    published TEXT,
+    published_ts REAL,
+    seen_at REAL
+);
+CREATE INDEX IF NOT EXISTS articles_published_ts ON articles(published_ts);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+    title, desc, content='articles', content_rowid='rowid',
+    tokenize='unicode61 remove_diacritics 2'
+);
+CREATE TRIGGER IF NOT EXISTS articles_ai AFTER INSERT ON articles BEGIN
+    INSERT INTO articles_fts(rowid, title, desc) VALUES (new.rowid, new.title, new.desc);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_ad AFTER DELETE ON articles BEGIN
+    INSERT INTO articles_fts(articles_fts, rowid, title, desc) VALUES ('delete', old.rowid, old.title, old.desc);
+END;
+CREATE TRIGGER IF NOT EXISTS articles_au AFTER UPDATE ON articles BEGIN
+    INSERT INTO articles_fts(articles_fts, rowid, title, desc) VALUES ('delete', old.rowid, old.title, old.desc);
+    INSERT INTO articles_fts(rowid, title, desc) VALUES (new.rowid, new.title, new.desc);
+END;
+"""
+
+_UPSERT = """
+INSERT INTO articles (url, link, title, desc, source, published, published_ts, seen_at)
+VALUES (:key, :url, :title, :desc, :source, :published, :published_ts, :seen_at)
+ON CONFLICT(url) DO UPDATE SET
+    title = excluded.title,
+    desc = excluded.desc,
+    published = COALESCE(excluded.published, articles.published),
+    published_ts = COALESCE(excluded.published_ts, articles.published_ts)
+WHERE excluded.title IS NOT articles.title
+   OR excluded.desc IS NOT articles.desc
+   OR (excluded.published_ts IS NOT NULL AND articles.published_ts IS NULL)
+"""
+
+_init_lock = threading.Lock()
+_initialized = False
+
+
+def _connect():
+    global _initialized
+    conn = open_db()
+    if not _initialized:
+        with _init_lock:
+            if not _initialized:
+                conn.executescript(_SCHEMA)
+                _initialized = True
+    return conn
+
+
+def entry_to_row(source: str, entry) -> Optional[Dict]:
+    """Entri feedparser → row standar search (tanpa hit_keywords)."""
+    link = getattr(entry, "link", "")
+    if not link:
+        return None
+    ts = entry_timestamp(entry)
+    return {
+        "title": getattr(entry, "title", ""),
+        "url": link,
+        "source": source,
+        "published": ts_to_wib(ts).isoformat() if ts is not None else getattr(entry, "published", None),
+        "published_ts": ts,
+        "desc": clean_html_desc(getattr(entry, "summary", "")),
+    }
+
+
+def index_rows(rows: Iterable[Dict]) -> int:
+    """Upsert row ke indeks (key = URL kanonik). Returns jumlah row baru/berubah."""
+    now = time.time()
+    params = []
+    for r in rows:
+        if not r or not r.get("url"):
+            continue
+        params.append({
+            "key": canonicalize(r["url"]),
+            "url": r["url"],
+            "title": r.get("title") or "",
+            "desc": r.get("desc") or "",
+            "source": r.get("source"),
+            "published": r.get("published"),
+            "published_ts": r.get("published_ts"),
+            "seen_at": now,
+        })
+    if not params:
+        return 0
+    try:
+        with closing(_connect()) as conn, conn:
+            cur = conn.executemany(_UPSERT, params)
+            return max(cur.rowcount, 0)
+    except Exception:
+        return 0
+
+
+def index_entries(source: str, entries: Iterable) -> int:
+    """Shortcut: indeks semua entri feedparser dari satu feed."""
+    return index_rows(entry_to_row(source, e) for e in entries or [])
+
+
+def set_meta(key: str, value: str) -> None:
+    try:
+        with closing(_connect()) as conn, conn:
+            conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES (?, ?)", (key, str(value)))
+    except Exception:
+        pass
+
+
+def get_meta(key: str) -> Optional[str]:
+    try:
+        with closing(_connect()) as conn:
+            row = conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+            return row[0] if row else None
+    except Exception:
+        return None
+
+
+def _fts_query(keywords: List[str]) -> str:
+    phrases = []
+    for kw in keywords:
+        k = kw.strip().replace('"', '""')
+        if k:
+            phrases.append(f'"{k}"')
+    return " OR ".join(phrases)
+
+
+def search_index(
+    keywords: List[str],
+    date_start=None,
+    date_end=None,
+    limit: int = 500,
+) -> List[Dict]:
+    """Cari di indeks lokal: cocok salah satu keyword, dalam rentang tanggal WIB (inklusif)."""
+    match = _fts_query(keywords)
+    if not match:
+        return []
+
+    sql = [
+        "SELECT a.link, a.title, a.desc, a.source, a.published, a.published_ts",
+        "FROM articles_fts JOIN articles a ON a.rowid = articles_fts.rowid",
+        "WHERE articles_fts MATCH ?",
+    ]
+    args: List = [match]
+    if date_start:
+        sql.append("AND a.published_ts >= ?")
+        args.append(datetime.combine(date_start, dtime.min, WIB).timestamp())
+    if date_end:
+        sql.append("AND a.published_ts <= ?")
+        args.append(datetime.combine(date_end, dtime.max, WIB).timestamp())
+    sql.append("ORDER BY a.published_ts DESC LIMIT ?")
+    args.append(int(limit))
+
+    try:
+        with closing(_connect()) as conn:
+            cur = conn.execute(" ".join(sql), args)
+            fetched = cur.fetchall()
+    except Exception:
+        return []
+
+    matcher = compile_keywords(keywords)
+    out = []
+    for link, title, desc, source, published, published_ts in fetched:
+        hits = matcher.find(title, desc)
+        if not hits:
+            continue
+        out.append({
+            "title": title,
+            "url": link,
+            "source": source,
+            "published": published,
+            "published_ts": published_ts,
+            "desc": desc,
+            "hit_keywords": ", ".join(hits),
+        })
+    return out
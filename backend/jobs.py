@@ -0,0 +1,223 @@
+# backend/jobs.py
+"""
+Job ekstraksi yang bisa dilanjutkan (checkpoint di news.db).
+- job_id deterministik dari (daftar URL, user agent): rerun Streamlit / reload
+  tab dengan input yang sama otomatis melanjutkan job yang sama
+- tiap URL punya status pending | done | failed + hasil fetch_article (JSON),
+  ditulis begitu satu artikel selesai
+- resume: hanya URL pending, atau failed yang masih bisa dicoba ulang
+  (percobaan < MAX_ATTEMPTS dan error bukan permanen)
+- hasil per URL dipakai lintas job (dalam JOB_TTL): daftar URL hasil pencarian
+  jarang identik antar run (indeks lokal & BM25 terus bertambah), jadi URL di job
+  baru diisi dari hasil terakhir URL yang sama di job lain (status, percobaan, error)
+- job lebih tua dari JOB_TTL dihapus saat job baru dibuat
+- skema dibuat sekali per proses; loop checkpoint memakai satu koneksi
+  (checkpoint_writer), satu commit kecil per URL
+"""
+import hashlib
+import json
+import os
+import threading
+import time
+from contextlib import closing, contextmanager
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+from backend.utils import open_db
+
+JOB_TTL = float(os.getenv("NEWS_JOB_TTL", str(7 * 86400)))  # detik
+MAX_ATTEMPTS = int(os.getenv("NEWS_JOB_MAX_ATTEMPTS", "3"))
+# error yang tidak akan berubah bila dicoba ulang
+PERMANENT_ERRORS = ("javascript_heavy_site",)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS extract_jobs (
+    job_id TEXT PRIMARY KEY,
+    user_agent TEXT,
+    total INTEGER NOT NULL,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS extract_job_urls (
+    job_id TEXT NOT NULL,
+    url TEXT NOT NULL,
+    pos INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    error TEXT,
+    result TEXT,
+    updated_at REAL,
+    PRIMARY KEY (job_id, url)
+);
+CREATE INDEX IF NOT EXISTS idx_job_urls_status ON extract_job_urls(job_id, status);
+CREATE INDEX IF NOT EXISTS idx_job_urls_url ON extract_job_urls(url, updated_at);
+"""
+
+
+_schema_ready = False
+_schema_lock = threading.Lock()
+
+
+def _connect():
+    global _schema_ready
+    conn = open_db()
+    if not _schema_ready:
+        with _schema_lock:
+            if not _schema_ready:
+                conn.executescript(_SCHEMA)
+                _schema_ready = True
+    return conn
+
+
+def job_id_for(urls: List[str], user_agent: Optional[str] = None) -> str:
+    h = hashlib.sha1((user_agent or "").encode("utf-8"))
+    for u in sorted(set(urls)):
+        h.update(b"\n" + u.encode("utf-8"))
+    return h.hexdigest()[:20]
+
+
+def start_job(urls: List[str], user_agent: Optional[str] = None) -> str:
+    """Buat job (atau pakai yang sudah ada untuk input yang sama). Returns job_id."""
+    job_id = job_id_for(urls, user_agent)
+    now = time.time()
+    try:
+        with closing(_connect()) as conn, conn:
+            old = [r[0] for r in conn.execute(
+                "SELECT job_id FROM extract_jobs WHERE updated_at < ? AND job_id != ?", (now - JOB_TTL, job_id),
+            )]
+            if old:
+                conn.executemany("DELETE FROM extract_job_urls WHERE job_id = ?", [(j,) for j in old])
+                conn.executemany("DELETE FROM extract_jobs WHERE job_id = ?", [(j,) for j in old])
+            conn.execute(
+                "INSERT INTO extract_jobs (job_id, user_agent, total, created_at, updated_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(job_id) DO UPDATE SET updated_at = excluded.updated_at",
+                (job_id, user_agent, len(urls), now, now),
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO extract_job_urls (job_id, url, pos) VALUES (?, ?, ?)",
+                [(job_id, u, i) for i, u in enumerate(urls)],
+            )
+            _adopt_results(conn, job_id, urls, now - JOB_TTL)
+    except Exception:
+        pass
+    return job_id
+
+
+def _adopt_results(conn, job_id: str, urls: List[str], since: float) -> None:
+    """URL pending di job ini ← hasil terakhir URL yang sama dari job lain yang masih segar."""
+    latest: Dict[str, Tuple] = {}
+    uniq = list(dict.fromkeys(urls))
+    for i in range(0, len(uniq), 500):
+        chunk = uniq[i:i + 500]
+        for row in conn.execute(
+            "SELECT u.url, u.status, u.attempts, u.error, u.result, u.updated_at "
+            "FROM extract_job_urls u JOIN extract_jobs j ON j.job_id = u.job_id "
+            f"WHERE u.url IN ({', '.join('?' * len(chunk))}) AND u.job_id != ? "
+            "AND u.status != 'pending' AND j.updated_at >= ? ORDER BY u.updated_at",
+            (*chunk, job_id, since),
+        ):
+            latest[row[0]] = row[1:]  # urut updated_at → yang terakhir menang
+    if latest:
+        conn.executemany(
+            "UPDATE extract_job_urls SET status = ?, attempts = ?, error = ?, result = ?, updated_at = ? "
+            "WHERE job_id = ? AND url = ? AND status = 'pending'",
+            [(*vals, job_id, url) for url, vals in latest.items()],
+        )
+
+
+def retryable(error: Optional[str], attempts: int) -> bool:
+    if attempts >= MAX_ATTEMPTS:
+        return False
+    return not (error and error.startswith(PERMANENT_ERRORS))
+
+
+def job_state(job_id: str) -> Tuple[List[Dict], List[str]]:
+    """
+    (hasil yang sudah final, URL yang perlu diproses) untuk job.
+    Final = done, atau failed yang tidak dicoba ulang lagi (hasil gagal terakhir dipakai).
+    """
+    finished: List[Dict] = []
+    todo: List[str] = []
+    try:
+        with closing(_connect()) as conn:
+            rows = conn.execute(
+                "SELECT url, status, attempts, error, result FROM extract_job_urls WHERE job_id = ? ORDER BY pos",
+                (job_id,),
+            ).fetchall()
+    except Exception:
+        return [], []
+    for url, status, attempts, error, result in rows:
+        if status == "done" or (status == "failed" and not retryable(error, attempts)):
+            try:
+                finished.append(json.loads(result))
+                continue
+            except (TypeError, ValueError):
+                pass
+        todo.append(url)
+    return finished, todo
+
+
+def _write_result(conn, job_id: str, result: Dict) -> None:
+    url = result.get("url")
+    if not job_id or not url:
+        return
+    status = "done" if result.get("text") else "failed"
+    now = time.time()
+    with conn:
+        conn.execute(
+            "UPDATE extract_job_urls SET status = ?, attempts = attempts + 1, error = ?, result = ?, updated_at = ? "
+            "WHERE job_id = ? AND url = ?",
+            (status, result.get("error"), json.dumps(result, default=str), now, job_id, url),
+        )
+        conn.execute("UPDATE extract_jobs SET updated_at = ? WHERE job_id = ?", (now, job_id))
+
+
+def record_result(job_id: str, result: Dict) -> None:
+    """Checkpoint satu artikel (koneksi sekali pakai; untuk loop pakai checkpoint_writer)."""
+    try:
+        with closing(_connect()) as conn:
+            _write_result(conn, job_id, result)
+    except Exception:
+        pass
+
+
+@contextmanager
+def checkpoint_writer(job_id: str) -> Iterator[Callable[[Dict], None]]:
+    """
+    with checkpoint_writer(job_id) as record: record(result) ...
+    Satu koneksi untuk seluruh loop; tiap record() commit sendiri (tahan kill di tengah jalan).
+    """
+    try:
+        conn = _connect()
+    except Exception:
+        yield lambda result: record_result(job_id, result)
+        return
+
+    def _record(result: Dict) -> None:
+        try:
+            _write_result(conn, job_id, result)
+        except Exception:
+            pass
+
+    try:
+        yield _record
+    finally:
+        conn.close()
+
+
+def job_progress(job_id: str) -> Dict[str, int]:
+    """{pending, done, failed, total, retryable} untuk ditampilkan di UI (retryable ⊂ failed)."""
+    counts = {"pending": 0, "done": 0, "failed": 0}
+    retry = 0
+    try:
+        with closing(_connect()) as conn:
+            for status, error, attempts in conn.execute(
+                "SELECT status, error, attempts FROM extract_job_urls WHERE job_id = ?", (job_id,),
+            ):
+                counts[status] = counts.get(status, 0) + 1
+                if status == "failed" and retryable(error, attempts):
+                    retry += 1
+    except Exception:
+        pass
+    counts["total"] = sum(counts.values())
+    counts["retryable"] = retry
+    return counts
@@ -0,0 +1,141 @@
+# backend/poller.py
+"""
+Poller feed di latar belakang (proses terpisah dari Streamlit).
+
+    python -m backend.poller            # loop terus
+    python -m backend.poller --once     # satu putaran (mis. via cron)
+
+Tiap feed punya interval sendiri yang menyesuaikan diri dengan frekuensi
+terbit: ada entri baru → interval dipersempit, tidak ada → diperlebar
+(dibatasi MIN_INTERVAL..MAX_INTERVAL). Hasil masuk ke indeks lokal
+(backend.index) + cache feed, yang dibaca search tanpa menunggu jaringan.
+"""
+import argparse
+import logging
+import time
+from contextlib import closing
+from typing import Dict, List, Tuple
+
+from backend.feedfetch import fetch_feeds
+from backend.feeds import ALL_FEEDS
+from backend.index import entry_to_row, get_meta, index_rows, set_meta
+from backend.utils import open_db
+
+MIN_INTERVAL = 3 * 60
+MAX_INTERVAL = 60 * 60
+START_INTERVAL = 15 * 60
+TICK = 30                     # jeda loop utama (detik)
+HEARTBEAT_KEY = "poller_heartbeat"
+FRESH_SECS = 5 * 60           # heartbeat lebih baru dari ini → poller dianggap aktif
+
+log = logging.getLogger("backend.poller")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS feed_schedule (
+    url TEXT PRIMARY KEY,
+    source TEXT,
+    interval REAL,
+    next_due REAL,
+    last_polled REAL,
+    last_new_at REAL,
+    last_new_count INTEGER
+);
+"""
+
+
+def _connect():
+    conn = open_db()
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def _load_schedule(feeds: List[Tuple[str, str]]) -> Dict[str, Dict]:
+    with closing(_connect()) as conn:
+        rows = conn.execute("SELECT url, interval, next_due, last_new_at FROM feed_schedule").fetchall()
+    known = {u: {"interval": i, "next_due": n, "last_new_at": ln} for u, i, n, ln in rows}
+    sched = {}
+    for src, url in feeds:
+        if url in sched:
+            continue
+        state = known.get(url) or {"interval": START_INTERVAL, "next_due": 0.0, "last_new_at": None}
+        sched[url] = {"source": src, **state}
+    return sched
+
+
+def next_interval(interval: float, new_count: int) -> float:
+    """Interval berikutnya: setengah bila ada entri baru, x1.5 bila sepi."""
+    if new_count > 0:
+        interval = interval * 0.5
+    else:
+        interval = interval * 1.5
+    return float(min(MAX_INTERVAL, max(MIN_INTERVAL, interval)))
+
+
+def poll_once(feeds: List[Tuple[str, str]] = ALL_FEEDS, force: bool = False) -> int:
+    """Satu putaran: poll feed yang sudah jatuh tempo. Returns jumlah feed yang di-poll."""
+    now = time.time()
+    sched = _load_schedule(feeds)
+    due = [(s["source"], u) for u, s in sched.items() if force or (s["next_due"] or 0) <= now]
+    set_meta(HEARTBEAT_KEY, now)
+    if not due:
+        return 0
+
+    results = fetch_feeds(due)
+    updates = []
+    for src, url, entries in results:
+        new_count = index_rows(entry_to_row(src, e) for e in entries or [])
+        s = sched[url]
+        interval = next_interval(s["interval"] or START_INTERVAL, new_count)
+        last_new_at = time.time() if new_count else s["last_new_at"]
+        updates.append((url, src, interval, time.time() + interval, time.time(), last_new_at, new_count))
+        log.info("%-28s %3d baru → interval %4.0f dtk  %s", src[:28], new_count, interval, url)
+
+    with closing(_connect()) as conn, conn:
+        conn.executemany(
+            "INSERT OR REPLACE INTO feed_schedule "
+            "(url, source, interval, next_due, last_polled, last_new_at, last_new_count) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            updates,
+        )
+    set_meta(HEARTBEAT_KEY, time.time())
+    return len(due)
+
+
+def poller_is_fresh(max_age: float = FRESH_SECS) -> bool:
+    """True bila poller latar belakang masih berdetak (search boleh skip crawl RSS)."""
+    try:
+        hb = float(get_meta(HEARTBEAT_KEY) or 0)
+    except ValueError:
+        return False
+    return (time.time() - hb) <= max_age
+
+
+def run_forever(tick: float = TICK) -> None:
+    while True:
+        try:
+            n = poll_once()
+            if n:
+                log.info("putaran selesai: %d feed", n)
+        except Exception as e:  # jangan biarkan daemon mati karena satu putaran
+            log.warning("poll gagal: %s", e)
+        time.sleep(tick)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Poller RSS media lokal → indeks lokal")
+    ap.add_argument("--once", action="store_true", help="jalankan satu putaran lalu keluar")
+    ap.add_argument("--force", action="store_true", help="abaikan jadwal, poll semua feed")
+    ap.add_argument("--tick", type=float, default=TICK, help="jeda loop utama (detik)")
+    args = ap.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(message)s")
+
+    if args.once:
+        poll_once(force=args.force)
+        return
+    if args.force:
+        poll_once(force=True)
+    run_forever(args.tick)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+# backend/ranking.py
+"""
+BM25 dengan inverted index inkremental (hidup selama proses).
+- tokenizer sadar bahasa Indonesia: normalisasi, buang tanda baca & stopword,
+  stemming ringan (partikel -lah/-kah/-pun, posesif -ku/-mu/-nya)
+- dokumen ditambahkan sekali (key = URL); statistik korpus (df, avgdl) ikut diperbarui
+- skor dihitung vektorial (NumPy) per posting list, bukan membangun ulang korpus
+"""
+import re
+import threading
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from backend.utils import normalize_text
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset("""
+ada adalah agar akan aku anda antara apa atau bagi bahwa baru belum bisa
+dalam dan dari dengan di dia ia ini itu jadi jika juga kali kami kamu karena
+ke kepada ketika lagi lain lalu maka masih mereka meski namun oleh pada para
+pun saat saja sama sampai sangat saya se sebagai sebuah secara sedang sejak
+seperti serta sudah supaya tak tanpa telah tentang terhadap tetapi tidak
+untuk usai yaitu yakni yang
+""".split())
+
+_PARTICLES = ("lah", "kah", "tah", "pun")
+_POSSESSIVES = ("nya", "ku", "mu")
+
+
+def _stem(tok: str) -> str:
+    """Stemming ringan: lepas satu partikel lalu satu posesif (sisa kata minimal 4 huruf)."""
+    for suffixes in (_PARTICLES, _POSSESSIVES):
+        for suf in suffixes:
+            if tok.endswith(suf) and len(tok) - len(suf) >= 4:
+                tok = tok[: -len(suf)]
+                break
+    return tok
+
+
+def tokenize(text: str, stem: bool = True) -> List[str]:
+    toks = _TOKEN_RE.findall(normalize_text(text))
+    out = []
+    for t in toks:
+        if t in STOPWORDS or len(t) < 2:
+            continue
+        out.append(_stem(t) if stem else t)
+    return out
+
+
+class BM25Index:
+    """Inverted index BM25 Okapi yang bisa ditambah dokumen kapan saja."""
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75, stem: bool = True, max_docs: int = 200_000):
+        self.k1 = k1
+        self.b = b
+        self.stem = stem
+        self.max_docs = max_docs
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self) -> None:
+        self._ids: Dict[str, int] = {}
+        self._postings: Dict[str, Tuple[array, array]] = {}
+        self._doc_len = np.zeros(1024, dtype=np.float32)
+        self._total_len = 0.0
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _add_locked(self, key: str, text: str) -> None:
+        if len(self._ids) >= self.max_docs:
+            self._reset()
+        doc = len(self._ids)
+        self._ids[key] = doc
+        tf: Dict[str, int] = {}
+        toks = tokenize(text, self.stem)
+        for t in toks:
+            tf[t] = tf.get(t, 0) + 1
+        for t, c in tf.items():
+            post = self._postings.get(t)
+            if post is None:
+                post = self._postings[t] = (array("i"), array("f"))
+            post[0].append(doc)
+            post[1].append(c)
+        if doc >= len(self._doc_len):
+            self._doc_len = np.concatenate([self._doc_len, np.zeros_like(self._doc_len)])
+        self._doc_len[doc] = len(toks)
+        self._total_len += len(toks)
+
+    def add_many(self, docs: Iterable[Tuple[str, str]]) -> int:
+        """Tambah (key, text) yang belum ada. Returns jumlah dokumen baru."""
+        added = 0
+        with self._lock:
+            for key, text in docs:
+                if not key or key in self._ids:
+                    continue
+                self._add_locked(key, text or "")
+                added += 1
+        return added
+
+    def score(self, query: str, keys: List[str]) -> np.ndarray:
+        """Skor BM25 query untuk tiap key (0 bila key belum diindeks)."""
+        q_terms = list(dict.fromkeys(tokenize(query, self.stem)))
+        with self._lock:
+            n = len(self._ids)
+            out = np.zeros(len(keys), dtype=np.float64)
+            if not n or not q_terms:
+                return out
+            dl = self._doc_len[:n]
+            avgdl = max(self._total_len / n, 1e-9)
+            norm = self.k1 * (1.0 - self.b + self.b * dl / avgdl)
+            scores = np.zeros(n, dtype=np.float64)
+            for t in q_terms:
+                post = self._postings.get(t)
+                if post is None:
+                    continue
+                # salinan, bukan view frombuffer: array.array yang sedang mengekspor
+                # buffer tidak bisa di-append (BufferError) oleh add_many di thread lain
+                docs = np.array(post[0], dtype=np.int32)
+                tf = np.array(post[1], dtype=np.float64)
+                df = len(docs)
+                idf = np.log(1.0 + (n - df + 0.5) / (df + 0.5))
+                scores[docs] += idf * tf * (self.k1 + 1.0) / (tf + norm[docs])
+            idx = np.fromiter((self._ids.get(k, -1) for k in keys), dtype=np.int64, count=len(keys))
+        known = idx >= 0
+        out[known] = scores[idx[known]]
+        return out
+
+
+_INDEX: Optional[BM25Index] = None
+_INDEX_LOCK = threading.Lock()
+
+
+def get_bm25_index() -> BM25Index:
+    """Index BM25 bersama (satu per proses)."""
+    global _INDEX
+    if _INDEX is None:
+        with _INDEX_LOCK:
+            if _INDEX is None:
+                _INDEX = BM25Index()
+    return _INDEX
+
+
+def _row_text(r: Dict) -> str:
+    return f"{r.get('title') or ''} {r.get('desc') or ''}"
+
+
+def index_rows_bm25(rows: Iterable[Dict]) -> int:
+    """Masukkan row search (title+desc) ke index BM25 bersama."""
+    return get_bm25_index().add_many((r["url"], _row_text(r)) for r in rows if r and r.get("url"))
+
+
+def bm25_rerank(rows: List[Dict], keywords: List[str], topk: Optional[int] = None) -> List[Dict]:
+    """Urutkan rows berdasarkan skor BM25 title+desc terhadap gabungan keyword (stabil)."""
+    if not rows:
+        return rows
+    index_rows_bm25(rows)
+    scores = get_bm25_index().score(" ".join(keywords), [r.get("url", "") for r in rows])
+    order = np.argsort(-scores, kind="stable")
+    if topk:
+        order = order[:topk]
+    return [rows[i] for i in order]
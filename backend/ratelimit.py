@@ -0,0 +1,251 @@
+# backend/ratelimit.py
+"""
+Penjadwal kesopanan per host (token bucket).
+- tiap host punya bucket sendiri: host berbeda jalan penuh kecepatan,
+  host yang sama dibatasi HOST_RATE request/detik (burst HOST_BURST)
+- feedback(): 429/503 → rate host dipotong setengah + diblokir tepat selama
+  Retry-After (reservasi yang sudah menunggu dipesan ulang setelah blokir);
+  respons sukses menaikkan rate pelan-pelan ke nilai awal (AIMD)
+- acquire() untuk kode sinkron (requests), acquire_async() untuk asyncio
+- get_limiter(): state bucket dibagi antar proses lewat SQLite (ratelimit.db),
+  sehingga downloader di proses utama dan cascade di pool ekstraksi memakai
+  bucket & umpan balik 429/Retry-After yang sama (NEWS_SHARED_LIMITER=0 →
+  state di memori per proses)
+"""
+import asyncio
+import email.utils
+import os
+import sqlite3
+import threading
+import time
+import urllib.parse
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from backend.utils import open_db
+
+HOST_RATE = float(os.getenv("NEWS_HOST_RATE", "0.5"))   # request/detik per host
+HOST_BURST = float(os.getenv("NEWS_HOST_BURST", "2"))
+MIN_RATE = 0.05                                          # batas bawah setelah 429/503 beruntun
+MAX_RETRY_AFTER = 300.0                                  # Retry-After lebih panjang dipotong ke sini
+CDN_RATE = 10.0                                          # cache AMP: CDN, bukan server publisher
+CDN_SUFFIXES = (".cdn.ampproject.org",)
+BLOCK_SLACK = 0.01                                       # toleransi jam saat cek blokir setelah tidur
+
+THROTTLE_STATUSES = (429, 503)
+SHARED_LIMITER = os.getenv("NEWS_SHARED_LIMITER", "1") != "0"
+
+
+def _host(url: str) -> str:
+    return urllib.parse.urlparse(url).netloc.lower()
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Header Retry-After (detik atau HTTP-date) → detik tunggu, None bila tidak valid."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        secs = float(value)
+    except ValueError:
+        try:
+            dt = email.utils.parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if dt is None:
+            return None
+        secs = dt.timestamp() - time.time()
+    return min(max(secs, 0.0), MAX_RETRY_AFTER)
+
+
+class _Bucket:
+    __slots__ = ("base_rate", "rate", "burst", "tokens", "last")
+
+    def __init__(self, rate: float, burst: float, now: float):
+        self.base_rate = rate
+        self.rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.last = now
+
+
+class HostRateLimiter:
+    """Token bucket per host (state di memori proses). Token boleh negatif = antrean reservasi berikutnya."""
+
+    _clock = staticmethod(time.monotonic)
+
+    def __init__(self, rate: float = HOST_RATE, burst: float = HOST_BURST):
+        self.rate = rate
+        self.burst = burst
+        self._buckets: Dict[str, _Bucket] = {}
+        self._lock = threading.Lock()
+
+    def _new_bucket(self, host: str, now: float) -> _Bucket:
+        rate = CDN_RATE if host.endswith(CDN_SUFFIXES) else self.rate
+        return _Bucket(rate, self.burst, now)
+
+    @contextmanager
+    def _locked_bucket(self, host: str, now: float, create: bool = True) -> Iterator[Optional[_Bucket]]:
+        """Bucket host dalam seksi kritis (perubahan di dalam blok langsung berlaku)."""
+        with self._lock:
+            b = self._buckets.get(host)
+            if b is None and create:
+                b = self._buckets[host] = self._new_bucket(host, now)
+            yield b
+
+    @staticmethod
+    def _refill(b: _Bucket, now: float) -> None:
+        if now > b.last:
+            b.tokens = min(b.burst, b.tokens + (now - b.last) * b.rate)
+            b.last = now
+
+    def reserve(self, url: str) -> float:
+        """Ambil satu token untuk host url; returns detik yang harus ditunggu sebelum request."""
+        if self.rate <= 0:
+            return 0.0
+        now = self._clock()
+        with self._locked_bucket(_host(url), now) as b:
+            self._refill(b, now)
+            b.tokens -= 1.0
+            ready_at = b.last + max(0.0, -b.tokens) / b.rate
+        return max(0.0, ready_at - now)
+
+    def blocked_for(self, url: str) -> float:
+        """Sisa blokir Retry-After host url (0 bila tidak diblokir)."""
+        if self.rate <= 0:
+            return 0.0
+        now = self._clock()
+        with self._locked_bucket(_host(url), now, create=False) as b:
+            # last hanya di masa depan selama blokir 429/503 (refill tidak memajukannya)
+            return max(0.0, b.last - now) if b is not None else 0.0
+
+    def acquire(self, url: str) -> None:
+        while True:
+            delay = self.reserve(url)
+            if delay <= 0:
+                return
+            time.sleep(delay)
+            # reservasi dibuat sebelum 429 datang → masih dalam Retry-After: pesan ulang
+            if self.blocked_for(url) <= BLOCK_SLACK:
+                return
+
+    async def _run(self, fn, *args):
+        """Operasi bucket dari event loop (di sini murni memori → langsung)."""
+        return fn(*args)
+
+    async def acquire_async(self, url: str) -> None:
+        while True:
+            delay = await self._run(self.reserve, url)
+            if delay <= 0:
+                return
+            await asyncio.sleep(delay)
+            if await self._run(self.blocked_for, url) <= BLOCK_SLACK:
+                return
+
+    def feedback(self, url: str, status: Optional[int], retry_after: Optional[str] = None) -> None:
+        """Umpan balik respons: 429/503 memperlambat host, sukses memulihkan rate."""
+        if self.rate <= 0 or status is None:
+            return
+        now = self._clock()
+        with self._locked_bucket(_host(url), now) as b:
+            self._refill(b, now)
+            if status in THROTTLE_STATUSES:
+                b.rate = max(MIN_RATE, b.rate * 0.5)
+                wait = parse_retry_after(retry_after)
+                if wait is None:
+                    wait = 1.0 / b.rate
+                # blokir: reservasi berikutnya tepat saat Retry-After habis; reservasi
+                # lama tidak dihitung (acquire memesan ulang bila bangun di dalam blokir)
+                b.last = max(b.last, now + wait)
+                b.tokens = 1.0
+            elif status < 400 and b.rate < b.base_rate:
+                b.rate = min(b.base_rate, b.rate + 0.1 * b.base_rate)
+
+    def pending_delay(self, url: str) -> float:
+        """Perkiraan tunggu untuk request berikutnya ke host url (tanpa mengambil token)."""
+        if self.rate <= 0:
+            return 0.0
+        now = self._clock()
+        with self._locked_bucket(_host(url), now, create=False) as b:
+            if b is None:
+                return 0.0
+            tokens = min(b.burst, b.tokens + max(0.0, now - b.last) * b.rate)
+            ready_at = max(b.last, now) + max(0.0, 1.0 - tokens) / b.rate
+        return max(0.0, ready_at - now)
+
+
+class SharedHostRateLimiter(HostRateLimiter):
+    """
+    Token bucket per host dengan state di SQLite (ratelimit.db): semua proses
+    (downloader + pool ekstraksi) berbagi bucket yang sama. Tiap operasi satu
+    transaksi BEGIN IMMEDIATE; jam = time.time() (sama di semua proses).
+    """
+
+    _clock = staticmethod(time.time)
+
+    _SCHEMA = """
+    CREATE TABLE IF NOT EXISTS host_buckets (
+        host TEXT PRIMARY KEY,
+        base_rate REAL NOT NULL,
+        rate REAL NOT NULL,
+        burst REAL NOT NULL,
+        tokens REAL NOT NULL,
+        last REAL NOT NULL
+    );
+    """
+
+    def __init__(self, rate: float = HOST_RATE, burst: float = HOST_BURST, db_name: str = "ratelimit.db"):
+        super().__init__(rate, burst)
+        self._conn = open_db(db_name)
+        self._conn.isolation_level = None  # transaksi eksplisit
+        self._conn.executescript(self._SCHEMA)
+
+    async def _run(self, fn, *args):
+        # BEGIN IMMEDIATE bisa menunggu proses lain → jangan blokir event loop
+        return await asyncio.to_thread(fn, *args)
+
+    @contextmanager
+    def _locked_bucket(self, host: str, now: float, create: bool = True) -> Iterator[Optional[_Bucket]]:
+        with self._lock:  # satu koneksi per proses, dipakai bergantian antar thread
+            conn = self._conn
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = conn.execute(
+                    "SELECT base_rate, rate, burst, tokens, last FROM host_buckets WHERE host = ?", (host,),
+                ).fetchone()
+                if row is None:
+                    b = self._new_bucket(host, now) if create else None
+                else:
+                    b = _Bucket(row[0], row[2], now)
+                    b.rate, b.tokens, b.last = row[1], row[3], row[4]
+                yield b
+                if b is not None:
+                    conn.execute(
+                        "INSERT OR REPLACE INTO host_buckets (host, base_rate, rate, burst, tokens, last) "
+                        "VALUES (?, ?, ?, ?, ?, ?)",
+                        (host, b.base_rate, b.rate, b.burst, b.tokens, b.last),
+                    )
+                conn.execute("COMMIT")
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+
+
+_limiter: Optional[HostRateLimiter] = None
+_limiter_lock = threading.Lock()
+
+
+def get_limiter() -> HostRateLimiter:
+    """Limiter bersama: state di SQLite (dibagi antar proses) atau, bila gagal/nonaktif, di memori proses."""
+    global _limiter
+    if _limiter is None:
+        with _limiter_lock:
+            if _limiter is None:
+                limiter: Optional[HostRateLimiter] = None
+                if SHARED_LIMITER:
+                    try:
+                        limiter = SharedHostRateLimiter()
+                    except sqlite3.Error:
+                        limiter = None
+                _limiter = limiter or HostRateLimiter()
+    return _limiter
@@ -1,118 +1,176 @@
 # backend/search.py
 import os
-from concurrent.futures import ThreadPoolExecutor, as_completed
-from typing import List, Dict, Optional
-import feedparser
-from dateutil import parser as dtparser
-from datetime import datetime
+import queue
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
 
 import streamlit as st
 from backend.feeds import ALL_FEEDS
-from backend.utils import parse_entry_date, matches_keyword_multi, is_in_date_range_str
+from backend.feedfetch import fetch_feeds, iter_feeds
+from backend.index import entry_to_row, index_rows, search_index
+from backend.poller import poller_is_fresh
+from backend.ranking import bm25_rerank, index_rows_bm25
+from backend.utils import canonicalize, clean_html_desc, compile_keywords, ts_in_date_range
 import urllib.parse
-import feedparser
-import pandas as pd
-from backend.utils import is_in_date_range_str, matches_keyword_multi
 import re
 
-from rank_bm25 import BM25Okapi
-import html as htmllib  # ← Tambahkan import ini di bagian atas
-
 NEWSAPI_KEY = os.getenv("NEWSAPI_KEY", "")  # set di Streamlit Secrets / env
+GNEWS_TTL = float(os.getenv("GNEWS_TTL", "900"))  # detik; cache hasil query Google News
 
-# Tambahkan fungsi helper setelah imports
-def clean_html_desc(text: str) -> str:
-    """Remove HTML tags dan decode HTML entities dari description"""
-    if not text:
-        return ""
-    
-    # 1. Decode HTML entities (&nbsp;, &amp;, dll)
-    text = htmllib.unescape(text)
-    
-    # 2. Remove semua HTML tags
-    text = re.sub(r'<[^>]+>', '', text)
-    
-    # 3. Remove extra whitespace
-    text = re.sub(r'\s+', ' ', text).strip()
-    
-    return text
+GNEWS_CACHE_MAX = int(os.getenv("GNEWS_CACHE_MAX", "256"))  # jumlah query yang disimpan (LRU)
 
-def _safe_sort_key(date_str):
-    try:
-        if not date_str: return datetime.min
-        return dtparser.parse(date_str).replace(tzinfo=None)
-    except Exception:
-        return datetime.min
+# (query, hl, gl) → (waktu ambil, entries); LRU, entri kedaluwarsa dibuang
+_GNEWS_CACHE: "OrderedDict[Tuple[str, str, str], Tuple[float, List]]" = OrderedDict()
+_GNEWS_LOCK = threading.Lock()
 
-@st.cache_data(show_spinner=False)
-def search_multi_source(
+_DONE = object()
+
+def iter_search_multi_source(
     keywords: List[str],
     max_results: int,
     date_start=None,
     date_end=None,
-    max_workers: int = 24,
-    use_google_news: bool = True,     # <— tambahkan ini
-    use_bm25_rerank: bool = True, 
-) -> List[Dict]:
-    rows: List[Dict] = []
+    max_workers: int = 64,
+    use_google_news: bool = True,
+    live: bool = True,
+) -> Iterator[List[Dict]]:
+    """
+    Varian streaming: yield batch row baru (sudah dedup by URL) begitu tiap sumber selesai.
+    Urutan: indeks lokal (instan) → tiap feed RSS saat selesai / Google News.
+    Semua entri yang terlihat masuk indeks lokal + BM25 setelah iterasi berakhir.
+    """
+    matcher = compile_keywords(keywords)  # sekali per query
+    seen = set()
+    seen_rows: List[Dict] = []
 
-    # 1) RSS lokal (paralel)
-    def _fetch(src, url):
-        try: return src, feedparser.parse(url)
-        except Exception: return src, None
-    
-    with ThreadPoolExecutor(max_workers=max_workers) as ex:
-        futures = [ex.submit(_fetch, s, u) for s, u in ALL_FEEDS]
-        for fut in as_completed(futures):
-            src, feed = fut.result()
-            if not feed: continue
-            for e in feed.entries:
-                hits = matches_keyword_multi(e, keywords)
-                if not hits: continue
-                link = getattr(e, "link", "")
-                if not link: continue
-                dt = parse_entry_date(e)
-                if (date_start or date_end) and (
-                    dt is None
-                    or (date_start and dt.date() < date_start)
-                    or (date_end and dt.date() > date_end)
-                ):
-                    continue
-                rows.append({
-                    "title": getattr(e, "title", ""),
-                    "url": link,
-                    "source": src,
-                    "published": dt.isoformat() if dt else getattr(e, "published", None),
-                    "desc": clean_html_desc(getattr(e, "summary", "")),  # ← Tambahkan clean_html_desc
-                    "hit_keywords": ", ".join(hits),
-                })
-            
-    # 2) Google News RSS (opsional)
+    def _fresh(batch: List[Dict]) -> List[Dict]:
+        out = []
+        for r in batch:
+            key = canonicalize(r["url"])  # varian m./www./AMP/utm_* = artikel yang sama
+            if key in seen: continue
+            seen.add(key); out.append(r)
+        return out
+
+    # 1) indeks lokal (menjangkau entri yang sudah keluar dari jendela feed)
+    batch = _fresh(search_index(keywords, date_start, date_end, limit=max(500, max_results * 5)))
+    if batch:
+        yield batch
+    if not live:
+        return
+
+    # 2) RSS lokal (asyncio, limit per-host, conditional GET) + Google News, paralel
+    q: "queue.Queue" = queue.Queue()
+    producers = []
+    if not poller_is_fresh():  # poller aktif → RSS lokal sudah ada di indeks
+        def _feeds():
+            for src, _url, entries in iter_feeds(ALL_FEEDS, max_connections=max_workers):
+                q.put(("entries", src, entries))
+        producers.append(_feeds)
     if use_google_news:
-        gnews_rows = search_google_news_rss(
-            keywords=keywords,
-            limit=max_results,           # biar banyak, nanti dipotong & dedup
-            date_start=date_start,
-            date_end=date_end,
-            filter_to_indonesia=False
-        )
-        rows.extend(gnews_rows)
+        def _gnews():
+            q.put(("rows", None, search_google_news_rss(
+                keywords=keywords,
+                limit=max_results,           # biar banyak, nanti dipotong & dedup
+                date_start=date_start,
+                date_end=date_end,
+                filter_to_indonesia=False,
+            )))
+        producers.append(_gnews)
 
-    # 3) dedup by URL + sort by published
-    seen = set(); uniq = []
-    for r in rows:
-        if r["url"] in seen: continue
-        seen.add(r["url"]); uniq.append(r)
+    def _run(fn):
+        try: fn()
+        except Exception: pass
+        finally: q.put(_DONE)
+
+    for fn in producers:
+        threading.Thread(target=_run, args=(fn,), daemon=True).start()
+
+    try:
+        pending = len(producers)
+        while pending:
+            item = q.get()
+            if item is _DONE:
+                pending -= 1
+                continue
+            kind, src, payload = item
+            if kind == "rows":
+                batch = _fresh(payload or [])
+            else:
+                matched = []
+                for e in payload or []:
+                    row = entry_to_row(src, e)  # tanggal diparse sekali di sini
+                    if not row: continue
+                    seen_rows.append(row)
+                    hits = matcher.find(row["title"], row["desc"])
+                    if not hits: continue
+                    if not ts_in_date_range(row["published_ts"], date_start, date_end):
+                        continue
+                    matched.append({**row, "hit_keywords": ", ".join(hits)})
+                batch = _fresh(matched)
+            if batch:
+                yield batch
+    finally:
+        # semua entri yang terlihat masuk indeks lokal + statistik korpus BM25
+        index_rows(seen_rows)
+        index_rows_bm25(seen_rows)
 
-    uniq.sort(key=lambda r: _safe_sort_key(r.get("published")), reverse=True)
 
-    # 4) BM25 rerank terhadap title+desc (opsional)
+def _finalize(rows: List[Dict], keywords: List[str], max_results: int, use_bm25_rerank: bool) -> List[Dict]:
+    # sort by published, lalu BM25 rerank terhadap title+desc (opsional)
+    rows = sorted(rows, key=lambda r: r.get("published_ts") or 0.0, reverse=True)
     if use_bm25_rerank:
-        uniq = bm25_rerank(uniq, keywords, topk=max_results)
-    else:
-        uniq = uniq[:max_results]
+        return bm25_rerank(rows, keywords, topk=max_results)
+    return rows[:max_results]
 
-    return uniq
+
+def search_multi_source_stream(
+    keywords: List[str],
+    max_results: int,
+    date_start=None,
+    date_end=None,
+    max_workers: int = 64,
+    use_google_news: bool = True,
+    use_bm25_rerank: bool = True,
+    live: bool = True,
+    on_rows: Optional[Callable[[List[Dict], List[Dict]], None]] = None,
+) -> List[Dict]:
+    """
+    Varian callback: on_rows(batch_baru, semua_row_sejauh_ini) dipanggil tiap ada batch,
+    lalu hasil akhir (sort + rerank) dikembalikan seperti search_multi_source.
+    """
+    rows: List[Dict] = []
+    for batch in iter_search_multi_source(
+        keywords, max_results, date_start, date_end, max_workers, use_google_news, live,
+    ):
+        rows.extend(batch)
+        if on_rows is not None:
+            on_rows(batch, rows)
+    return _finalize(rows, keywords, max_results, use_bm25_rerank)
+
+
+@st.cache_data(show_spinner=False)
+def search_multi_source(
+    keywords: List[str],
+    max_results: int,
+    date_start=None,
+    date_end=None,
+    max_workers: int = 64,
+    use_google_news: bool = True,     # <— tambahkan ini
+    use_bm25_rerank: bool = True, 
+    live: bool = True,
+) -> List[Dict]:
+    """
+    Cari kandidat berita.
+    live=True  → crawl RSS (+ Google News) lalu gabung dengan indeks lokal
+    live=False → jawab langsung dari indeks lokal (tanpa akses jaringan)
+    Bila poller latar belakang aktif, RSS lokal dibaca dari indeks (tanpa crawl).
+    """
+    return search_multi_source_stream(
+        keywords, max_results, date_start, date_end, max_workers,
+        use_google_news, use_bm25_rerank, live,
+    )
 
 # domain Indonesia yang umum (untuk menyaring hasil GNews ke media lokal)
 INDO_DOMAINS_RE = re.compile(
@@ -137,9 +195,9 @@ def _unwrap_gnews_link(link: str) -> str:
     try:
         if not link or "news.google.com" not in link:
             return link
-        
+    
         parsed = urllib.parse.urlparse(link)
-        
+    
         # Case 1: URL parameter exists
         qs = dict(urllib.parse.parse_qsl(parsed.query))
         if "url" in qs and qs["url"]:
@@ -147,36 +205,69 @@ def _unwrap_gnews_link(link: str) -> str:
             # Pastikan bukan Google domain
             if "google.com" not in unwrapped:
                 return unwrapped
-        
+    
         # Case 2: /articles/ path - biarkan untuk di-resolve di extractor
         # Jangan decode di sini, biar extract.py yang handle
         if "/articles/" in link:
             return link
-        
+    
         # Case 3: /rss/articles/ - sama seperti di atas
         if "/rss/articles/" in link:
             return link
             
         return link
-        
+    
     except Exception:
         return link
 
 
-def bm25_rerank(rows: list[dict], keywords: list[str], topk: int | None = None) -> list[dict]:
-    if not rows:
-        return rows
-    df = pd.DataFrame(rows)
-    df["__txt"] = (df.get("title","") + " " + df.get("desc","")).str.lower()
-    corpus = [t.split() for t in df["__txt"].tolist()]
-    bm25 = BM25Okapi(corpus)
-    query_tokens = " ".join(keywords).lower().split()
-    scores = bm25.get_scores(query_tokens)
-    df["__bm25"] = scores
-    df = df.sort_values("__bm25", ascending=False)
-    if topk:
-        df = df.head(topk)
-    return df.drop(columns=["__txt","__bm25"], errors="ignore").to_dict(orient="records")
+def _gnews_entries(queries: List[str], lang: str = "id", country: str = "ID", ttl: Optional[float] = None) -> Dict[str, List]:
+    """
+    Entri Google News RSS per query: dari cache TTL bila masih segar,
+    sisanya diambil bersamaan dalam satu putaran asyncio.
+    """
+    ttl = GNEWS_TTL if ttl is None else ttl
+    now = time.time()
+    out: Dict[str, List] = {}
+    missing = []
+    with _GNEWS_LOCK:
+        for q in dict.fromkeys(queries):
+            key = (q, lang, country)
+            hit = _GNEWS_CACHE.get(key)
+            if hit and now - hit[0] < ttl:
+                _GNEWS_CACHE.move_to_end(key)
+                out[q] = hit[1]
+            else:
+                if hit:
+                    del _GNEWS_CACHE[key]
+                missing.append(q)
+
+    if missing:
+        urls = {q: _gnews_rss_url(q, lang=lang, country=country) for q in missing}
+        fetched = fetch_feeds(
+            [(q, u) for q, u in urls.items()],
+            per_host=8,
+            conditional=False,
+        )
+        with _GNEWS_LOCK:
+            for q, _u, entries in fetched:
+                if entries is None:      # gagal → jangan di-cache
+                    out[q] = []
+                    continue
+                _GNEWS_CACHE[(q, lang, country)] = (time.time(), entries)
+                _GNEWS_CACHE.move_to_end((q, lang, country))
+                out[q] = entries
+            _prune_gnews_cache_locked(ttl)
+    return out
+
+
+def _prune_gnews_cache_locked(ttl: float) -> None:
+    """Buang entri kedaluwarsa lalu yang paling lama tak dipakai di atas GNEWS_CACHE_MAX."""
+    now = time.time()
+    for key in [k for k, (ts, _e) in _GNEWS_CACHE.items() if now - ts >= ttl]:
+        del _GNEWS_CACHE[key]
+    while len(_GNEWS_CACHE) > GNEWS_CACHE_MAX:
+        _GNEWS_CACHE.popitem(last=False)
 
 def search_google_news_rss(
     keywords: list[str],
@@ -184,22 +275,33 @@ def search_google_news_rss(
     date_start=None,
     date_end=None,
     filter_to_indonesia: bool = True,
+    ttl: Optional[float] = None,
 ) -> list[dict]:
-    """Cari via Google News RSS untuk setiap keyword, lalu gabung & saring tanggal/brand lokal."""
+    """
+    Cari via Google News RSS untuk setiap keyword (konkuren, cache TTL per query),
+    lalu gabung & saring tanggal/brand lokal.
+    """
     out = []
+    seen_rows = []
+    matcher = compile_keywords(keywords)
     per_kw = max(5, limit // max(1, len(keywords)))  # alokasi kasar per keyword
 
+    by_kw = _gnews_entries(keywords, lang="id", country="ID", ttl=ttl)
     for kw in keywords:
-        rss_url = _gnews_rss_url(kw, lang="id", country="ID")
-        feed = feedparser.parse(rss_url)
-        for e in feed.entries[:per_kw]:
+        for e in by_kw.get(kw, [])[:per_kw]:
             title = getattr(e, "title", "")
             desc = clean_html_desc(getattr(e, "summary", ""))  # ← Tambahkan clean_
             link = _unwrap_gnews_link(getattr(e, "link", ""))
             pub = getattr(e, "published", None)
 
+            seen_row = entry_to_row("Google News", e)  # tanggal diparse sekali di sini
+            ts = seen_row["published_ts"] if seen_row else None
+            if seen_row:
+                seen_row["url"] = link
+                seen_rows.append(seen_row)
+
             # saring tanggal (inklusif) → skip jika filter aktif & tanggal tak ada/di luar range
-            if not is_in_date_range_str(pub, date_start, date_end):
+            if not ts_in_date_range(ts, date_start, date_end):
                 continue
 
             # saring domain ke media Indonesia (opsional)
@@ -207,7 +309,7 @@ def search_google_news_rss(
                 continue
 
             # pastikan match setidaknya salah satu keyword (kadang GNews “longgar”)
-            hits = [k for k in keywords if k.lower() in (title + " " + desc).lower()]
+            hits = matcher.find(title, desc)
             if not hits:
                 continue
 
@@ -216,13 +318,17 @@ def search_google_news_rss(
                 "url": link,
                 "source": "Google News",
                 "published": pub,
+                "published_ts": ts,
                 "desc": desc,
                 "hit_keywords": ", ".join(hits),
             })
 
-    # dedup by URL
+    index_rows(seen_rows)
+
+    # dedup by URL kanonik
     seen = set(); uniq = []
     for r in out:
-        if r["url"] in seen: continue
-        seen.add(r["url"]); uniq.append(r)
+        key = canonicalize(r["url"])
+        if key in seen: continue
+        seen.add(key); uniq.append(r)
     return uniq[:limit]
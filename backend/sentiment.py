@@ -4,6 +4,8 @@ from typing import List, Dict
 import streamlit as st
 from transformers import AutoTokenizer, AutoModelForSequenceClassification, pipeline
 
+from backend.dedup import cluster_near_duplicates, cluster_representatives
+
 @st.cache_resource(show_spinner=False)
 def load_models():
     tried = []
@@ -65,3 +67,18 @@ def batch_sentiment(texts: List[str], clf_bundle: Dict, batch_size: int = 8):
                     labels.append("netral"); scores.append(0.0)
             i += batch_size
     return labels, scores
+
+def clustered_sentiment(texts: List[str], clf_bundle: Dict, batch_size: int = 8):
+    """
+    Sentimen sekali per cluster hampir-duplikat (lihat backend.dedup), hasil
+    wakil cluster (teks terpanjang) disalin ke semua anggotanya.
+    Returns (labels, scores, cluster_ids) sejajar dengan texts.
+    """
+    cluster_ids = cluster_near_duplicates(texts)
+    reps = cluster_representatives(texts, cluster_ids)
+    cids = list(reps)
+    rep_labels, rep_scores = batch_sentiment([texts[reps[c]] for c in cids], clf_bundle, batch_size=batch_size)
+    by_cluster = {c: (l, s) for c, l, s in zip(cids, rep_labels, rep_scores)}
+    labels = [by_cluster[c][0] for c in cluster_ids]
+    scores = [by_cluster[c][1] for c in cluster_ids]
+    return labels, scores, cluster_ids
@@ -0,0 +1,255 @@
+# backend/sitetemplates.py
+"""
+Template ekstraksi per publisher (jalur cepat sebelum cascade generik).
+Tiap domain punya daftar selector untuk body, title, date (dan elemen yang
+dibuang dari body). Selector berupa XPath; awalan "css:" → CSS selector
+(butuh paket cssselect). Semua dikompilasi sekali per proses dengan lxml.
+Hasil divalidasi (panjang minimal & jumlah paragraf); gagal → cascade biasa.
+"""
+import copy
+import re
+import threading
+from typing import Callable, Dict, List, Optional
+
+from lxml import etree, html as lxml_html
+
+from backend.utils import parse_date_ts, ts_to_wib
+
+MIN_CHARS = 300
+MIN_PARAGRAPHS = 2
+
+# selector yang dipakai semua template bila selector khusus tidak ketemu
+COMMON_TITLE = [
+    "//meta[@property='og:title']/@content",
+    "//h1",
+]
+COMMON_DATE = [
+    "//meta[@property='article:published_time']/@content",
+    "//meta[@name='publishdate']/@content",
+    "//meta[@name='pubdate']/@content",
+    "//meta[@itemprop='datePublished']/@content",
+    "//time/@datetime",
+]
+COMMON_DESC = [
+    "//meta[@name='description']/@content",
+    "//meta[@property='og:description']/@content",
+]
+_DROP_CLASSES = (
+    "baca-juga", "bacajuga", "read-also", "ads", "advertisement", "banner",
+    "related", "related-news", "share", "social-share", "tags",
+)
+COMMON_DROP = [
+    ".//script", ".//style", ".//noscript", ".//iframe", ".//figure", ".//table",
+    # cocokkan token class utuh (bukan substring: "ads" ≠ "reads")
+    ".//*[" + " or ".join(
+        f"contains(concat(' ', normalize-space(@class), ' '), ' {c} ')" for c in _DROP_CLASSES
+    ) + "]",
+]
+
+# domain (tanpa www./m.; subdomain ikut cocok) → selector
+SITE_TEMPLATES: Dict[str, Dict[str, List[str]]] = {
+    "detik.com": {
+        "body": ["//div[contains(@class,'detail__body-text')]"],
+        "title": ["//h1[contains(@class,'detail__title')]"],
+        "drop": [".//*[contains(@class,'parallaxindetail')]", ".//*[contains(@class,'detail__body-tag')]"],
+    },
+    "kompas.com": {
+        "body": ["//div[contains(@class,'read__content')]"],
+        "title": ["//h1[contains(@class,'read__title')]"],
+        "drop": [".//*[contains(@class,'inner-link-baca-juga')]"],
+    },
+    "tempo.co": {
+        "body": ["//div[@id='isi']", "//div[contains(@class,'detail-konten')]"],
+        "title": ["//h1[contains(@class,'title')]"],
+    },
+    "liputan6.com": {
+        "body": ["//div[contains(@class,'article-content-body__item-content')]"],
+        "title": ["//h1[contains(@class,'read-page--header--title')]"],
+        "date": ["//time[contains(@class,'read-page--header--author__datetime')]/@datetime"],
+    },
+    "tribunnews.com": {
+        "body": ["//div[contains(@class,'side-article') and contains(@class,'txt-article')]"],
+        "title": ["//h1[@id='arttitle']"],
+    },
+    "antaranews.com": {
+        "body": ["//div[contains(@class,'post-content')]"],
+        "title": ["//h1[contains(@class,'post-title')]"],
+        "drop": [".//p[contains(@class,'text-muted')]"],
+    },
+    "cnnindonesia.com": {
+        "body": ["//div[contains(@class,'detail-text')]", "//div[@id='detikdetailtext']"],
+    },
+    "cnbcindonesia.com": {
+        "body": ["//div[contains(@class,'detail_text')]", "//div[contains(@class,'detail-text')]"],
+    },
+    "merdeka.com": {
+        "body": ["//div[contains(@class,'mdk-body-paragraph')]", "//div[contains(@class,'article-body')]"],
+    },
+    "republika.co.id": {
+        "body": ["//div[contains(@class,'article-content')]"],
+    },
+    "beritasatu.com": {
+        "body": ["//div[contains(@class,'body-content')]", "//div[contains(@class,'story')]"],
+    },
+    "kumparan.com": {
+        "body": ["//div[@data-qa-id='story-content']", "//div[contains(@class,'StoryRenderer')]"],
+    },
+    "viva.co.id": {
+        "body": ["//div[contains(@class,'main-content-detail')]"],
+    },
+    "okezone.com": {
+        "body": ["//div[@id='contentx']"],
+    },
+    "idntimes.com": {
+        "body": ["//div[contains(@class,'article-content')]", "//section[contains(@class,'content-post')]"],
+    },
+    "sindonews.com": {
+        "body": ["//div[@id='detail-desc']", "//div[contains(@class,'detail-desc')]"],
+    },
+    "medcom.id": {
+        "body": ["//div[contains(@class,'text') and @itemprop='articleBody']", "//div[@itemprop='articleBody']"],
+    },
+    "jpnn.com": {
+        "body": ["//div[@itemprop='articleBody']", "//div[contains(@class,'page-content')]"],
+    },
+    "bisnis.com": {
+        "body": ["//article[contains(@class,'detailsContent')]", "//div[contains(@class,'detailsContent')]"],
+    },
+    "kontan.co.id": {
+        "body": ["//div[contains(@class,'tmpt-desk-kon')]", "//div[@itemprop='articleBody']"],
+    },
+    "katadata.co.id": {
+        "body": ["//div[contains(@class,'detail-body')]", "//div[contains(@class,'textArticle')]"],
+    },
+    "investor.id": {
+        "body": ["//div[contains(@class,'body-content')]"],
+    },
+    "tirto.id": {
+        "body": ["//div[contains(@class,'content-text-editor')]"],
+    },
+    "mediaindonesia.com": {
+        "body": ["//div[contains(@class,'article-content')]", "//div[@itemprop='articleBody']"],
+    },
+    "suara.com": {
+        "body": ["//article[contains(@class,'detail-content')]", "//div[contains(@class,'detail--content')]"],
+    },
+    "jawapos.com": {
+        "body": ["//div[contains(@class,'content-article')]", "//div[contains(@class,'read__content')]"],
+    },
+    "pikiran-rakyat.com": {
+        "body": ["//article[contains(@class,'read__content')]", "//div[contains(@class,'read__content')]"],
+    },
+    "theconversation.com": {
+        "body": ["//div[@itemprop='articleBody']"],
+    },
+}
+
+_compiled: Dict[str, Dict[str, List[Callable]]] = {}
+_compiled_lock = threading.Lock()
+_WS_RE = re.compile(r"\s+")
+
+
+def _compile_one(expr: str) -> Optional[Callable]:
+    try:
+        if expr.startswith("css:"):
+            from lxml.cssselect import CSSSelector  # butuh paket cssselect
+            return CSSSelector(expr[4:])
+        return etree.XPath(expr)
+    except Exception:
+        return None
+
+
+def _compile(rules: Dict[str, List[str]]) -> Dict[str, List[Callable]]:
+    fields = {
+        "body": rules.get("body", []),
+        "title": rules.get("title", []) + COMMON_TITLE,
+        "date": rules.get("date", []) + COMMON_DATE,
+        "drop": rules.get("drop", []) + COMMON_DROP,
+        "desc": COMMON_DESC,
+    }
+    return {k: [c for c in map(_compile_one, exprs) if c is not None] for k, exprs in fields.items()}
+
+
+def template_for(domain: str) -> Optional[Dict[str, List[Callable]]]:
+    """Template terkompilasi untuk domain (juga subdomain, mis. news.detik.com → detik.com)."""
+    labels = (domain or "").split(".")
+    for i in range(len(labels) - 1):
+        key = ".".join(labels[i:])
+        if key in SITE_TEMPLATES:
+            tpl = _compiled.get(key)
+            if tpl is None:
+                with _compiled_lock:
+                    tpl = _compiled.get(key)
+                    if tpl is None:
+                        tpl = _compiled[key] = _compile(SITE_TEMPLATES[key])
+            return tpl
+    return None
+
+
+def _first_text(selectors: List[Callable], tree) -> Optional[str]:
+    for sel in selectors:
+        try:
+            found = sel(tree)
+        except Exception:
+            continue
+        for item in found if isinstance(found, list) else [found]:
+            value = item if isinstance(item, str) else getattr(item, "text_content", lambda: "")()
+            value = _WS_RE.sub(" ", value or "").strip()
+            if value:
+                return value
+    return None
+
+
+def _body_text(tpl: Dict[str, List[Callable]], tree) -> Optional[str]:
+    for sel in tpl["body"]:
+        try:
+            nodes = sel(tree)
+        except Exception:
+            continue
+        if not nodes:
+            continue
+        node = copy.deepcopy(nodes[0])  # pohon asli tidak diubah (bisa dipakai extractor lain)
+        for drop in tpl["drop"]:
+            try:
+                for el in drop(node):
+                    el.drop_tree()
+            except Exception:
+                continue
+        paras = [_WS_RE.sub(" ", p.text_content()).strip() for p in node.iter("p")]
+        paras = [p for p in paras if p and not p.lower().startswith("baca juga")]
+        # paragraf terlalu sedikit → selector salah sasaran; jangan pakai text_content()
+        # seluruh node (ikut teks script/style/widget), coba selector berikutnya
+        if len(paras) >= MIN_PARAGRAPHS:
+            return "\n".join(paras)
+    return None
+
+
+def extract_with_template(domain: str, html_text: str, tree=None) -> Optional[Dict]:
+    """
+    Ekstraksi cepat via template publisher.
+    Returns {text, title, publish_date, meta_desc} bila lolos validasi; None bila tidak ada
+    template / hasil tidak valid (→ lanjut ke cascade generik).
+    tree: pohon lxml yang sudah di-parse (opsional).
+    """
+    tpl = template_for(domain)
+    if tpl is None or not html_text:
+        return None
+    if tree is None:
+        try:
+            tree = lxml_html.fromstring(html_text)
+        except Exception:
+            return None
+    text = _body_text(tpl, tree)
+    if not text or len(text) < MIN_CHARS:
+        return None
+    publish_date = None
+    raw_date = _first_text(tpl["date"], tree)
+    ts = parse_date_ts(raw_date) if raw_date else None
+    if ts is not None:
+        publish_date = ts_to_wib(ts).strftime("%Y-%m-%d")
+    return {
+        "text": text,
+        "title": _first_text(tpl["title"], tree),
+        "publish_date": publish_date,
+        "meta_desc": _first_text(tpl["desc"], tree),
+    }
@@ -0,0 +1,212 @@
+# backend/structured.py
+"""
+Ekstraksi dari data terstruktur yang ditanam di halaman (tanpa heuristik
+boilerplate & tanpa headless browser):
+- JSON-LD  <script type="application/ld+json"> → NewsArticle/Article:
+  articleBody, headline, datePublished, description
+- Next.js  <script id="__NEXT_DATA__">  → objek dengan kunci body/konten
+- Nuxt     <script id="__NUXT_DATA__"> / window.__NUXT__ = {...} (JSON murni)
+Body berupa HTML diubah ke teks per paragraf. Hasil divalidasi panjangnya.
+"""
+import html as htmllib
+import json
+import re
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from lxml import html as lxml_html
+
+from backend.utils import parse_date_ts, ts_to_wib
+
+MIN_CHARS = 300
+MAX_DEPTH = 40
+
+ARTICLE_TYPES = {
+    "article", "newsarticle", "reportagenewsarticle", "analysisnewsarticle",
+    "blogposting", "opinionnewsarticle", "backgroundnewsarticle", "report",
+}
+BODY_KEYS = ("articleBody", "articlebody", "body", "content", "bodyText", "body_text", "contentHtml", "html")
+# kunci body yang spesifik artikel: diterima dari objek mana pun di state aplikasi
+STRICT_BODY_KEYS = ("articleBody", "articlebody", "bodyText", "body_text", "contentHtml")
+# kunci generik (body/content/html) hanya diterima dari objek yang juga punya identitas artikel
+IDENTITY_KEYS = ("headline", "title", "slug")
+TYPE_KEYS = ("@type", "__typename", "type", "contentType", "content_type")
+_ARTICLE_TYPE_RE = re.compile(r"article|news|post|story|berita", re.I)
+TITLE_KEYS = ("headline", "title", "name")
+DATE_KEYS = ("datePublished", "publishedAt", "published_at", "publish_date", "publishDate", "date")
+DESC_KEYS = ("description", "summary", "excerpt", "subtitle")
+
+_NUXT_RE = re.compile(r"window\.__NUXT__\s*=\s*(\{.*?\})\s*;?\s*</script>", re.S)
+_TAG_RE = re.compile(r"<[^>]+>")
+_WS_RE = re.compile(r"\s+")
+
+
+def _loads(raw: Optional[str]):
+    if not raw:
+        return None
+    raw = raw.strip()
+    if raw.startswith("<!--"):
+        raw = raw[4:].rsplit("-->", 1)[0]
+    try:
+        return json.loads(raw)
+    except ValueError:
+        try:
+            # sebagian situs menulis JSON-LD dengan entity HTML / control char
+            return json.loads(htmllib.unescape(raw), strict=False)
+        except ValueError:
+            return None
+
+
+def _html_to_text(value: str) -> str:
+    """Body (HTML atau teks biasa) → teks, satu paragraf per baris."""
+    if "<" not in value:
+        return _WS_RE.sub(" ", htmllib.unescape(value)).strip()
+    try:
+        frag = lxml_html.fragment_fromstring(value, create_parent="div")
+        paras = [_WS_RE.sub(" ", p.text_content()).strip() for p in frag.iter("p")]
+        paras = [p for p in paras if p and not p.lower().startswith("baca juga")]
+        if paras:
+            return "\n".join(paras)
+        return _WS_RE.sub(" ", frag.text_content()).strip()
+    except Exception:
+        return _WS_RE.sub(" ", htmllib.unescape(_TAG_RE.sub(" ", value))).strip()
+
+
+def _first_str(obj: Dict, keys: Tuple[str, ...]) -> Optional[str]:
+    for k in keys:
+        v = obj.get(k)
+        if isinstance(v, str) and v.strip():
+            return v.strip()
+    return None
+
+
+def _walk(obj, depth: int = 0) -> Iterator[Dict]:
+    """Semua dict di dalam struktur JSON (DFS, kedalaman dibatasi)."""
+    if depth > MAX_DEPTH:
+        return
+    if isinstance(obj, dict):
+        yield obj
+        for v in obj.values():
+            if isinstance(v, (dict, list)):
+                yield from _walk(v, depth + 1)
+    elif isinstance(obj, list):
+        for v in obj:
+            if isinstance(v, (dict, list)):
+                yield from _walk(v, depth + 1)
+
+
+def _is_article(obj: Dict) -> bool:
+    t = obj.get("@type")
+    types = t if isinstance(t, list) else [t]
+    return any(isinstance(x, str) and x.lower() in ARTICLE_TYPES for x in types)
+
+
+def _candidate(obj: Dict, body_keys: Tuple[str, ...]) -> Optional[Dict]:
+    raw = _first_str(obj, body_keys)
+    if not raw:
+        return None
+    text = _html_to_text(raw)
+    if len(text) < MIN_CHARS:
+        return None
+    return {
+        "text": text,
+        "title": _first_str(obj, TITLE_KEYS),
+        "date": _first_str(obj, DATE_KEYS),
+        "desc": _first_str(obj, DESC_KEYS),
+    }
+
+
+def _from_json_ld(payloads: List) -> Optional[Dict]:
+    best = None
+    for payload in payloads:
+        for obj in _walk(payload):
+            if not _is_article(obj):
+                continue
+            cand = _candidate(obj, ("articleBody", "articlebody", "text"))
+            if cand and (best is None or len(cand["text"]) > len(best["text"])):
+                best = cand
+    return best
+
+
+def _looks_like_article(obj: Dict) -> bool:
+    """Objek state punya identitas artikel: judul/slug, atau tipe yang mirip artikel."""
+    if _first_str(obj, IDENTITY_KEYS):
+        return True
+    for k in TYPE_KEYS:
+        v = obj.get(k)
+        if isinstance(v, str) and _ARTICLE_TYPE_RE.search(v):
+            return True
+    return False
+
+
+def _from_app_state(payload) -> Optional[Dict]:
+    """
+    State Next.js/Nuxt: objek dengan body terpanjang yang lolos validasi.
+    Kunci generik (body/content/html) hanya dari objek beridentitas artikel —
+    daftar komentar, blok artikel terkait, atau wrapper halaman CMS tidak ikut.
+    """
+    best = None
+    for obj in _walk(payload):
+        cand = _candidate(obj, BODY_KEYS if _looks_like_article(obj) else STRICT_BODY_KEYS)
+        if cand and (best is None or len(cand["text"]) > len(best["text"])):
+            best = cand
+    if best is None and isinstance(payload, list):
+        # payload Nuxt 3 (devalue): array datar → string HTML terpanjang
+        htmls = [v for v in payload if isinstance(v, str) and "<p" in v]
+        if htmls:
+            text = _html_to_text(max(htmls, key=len))
+            if len(text) >= MIN_CHARS:
+                best = {"text": text, "title": None, "date": None, "desc": None}
+    return best
+
+
+def extract_structured(tree, html_text: str = "") -> Optional[Dict]:
+    """
+    Body + metadata dari JSON-LD / __NEXT_DATA__ / Nuxt state.
+    Returns {text, title, publish_date, meta_desc, source} atau None
+    (source: "json-ld" | "next" | "nuxt").
+    """
+    if tree is None:
+        return None
+    found: Optional[Dict] = None
+    source = None
+
+    ld = [_loads(s) for s in tree.xpath("//script[@type='application/ld+json']/text()")]
+    ld = [p for p in ld if p is not None]
+    if ld:
+        found, source = _from_json_ld(ld), "json-ld"
+
+    if found is None:
+        raw = tree.xpath("//script[@id='__NEXT_DATA__']/text()")
+        payload = _loads(raw[0]) if raw else None
+        if payload is not None:
+            found, source = _from_app_state(payload), "next"
+
+    if found is None:
+        raw = tree.xpath("//script[@id='__NUXT_DATA__']/text()")
+        payload = _loads(raw[0]) if raw else None
+        if payload is None and "__NUXT__" in html_text:
+            m = _NUXT_RE.search(html_text)
+            payload = _loads(m.group(1)) if m else None
+        if payload is not None:
+            found, source = _from_app_state(payload), "nuxt"
+
+    if found is None:
+        return None
+    ts = parse_date_ts(found["date"]) if found["date"] else None
+    return {
+        "text": found["text"],
+        "title": htmllib.unescape(found["title"]) if found["title"] else None,
+        "publish_date": ts_to_wib(ts).strftime("%Y-%m-%d") if ts is not None else None,
+        "meta_desc": htmllib.unescape(found["desc"]) if found["desc"] else None,
+        "source": source,
+    }
+
+
+def has_structured_data(tree) -> bool:
+    """Ada payload JSON yang bisa dicoba? (untuk membedakan 'tidak berlaku' dari 'gagal')."""
+    if tree is None:
+        return False
+    return bool(tree.xpath(
+        "//script[@type='application/ld+json' or @id='__NEXT_DATA__' or @id='__NUXT_DATA__']"
+        " | //script[contains(text(), 'window.__NUXT__')]"
+    ))
@@ -0,0 +1,149 @@
+# backend/urlcanon.py
+"""
+Kanonikalisasi URL artikel (memoized, aturan per publisher).
+- clean_url(u): URL yang masih bisa diunduh — buang parameter pelacak
+  (utm_*, gclid, fbclid, ...), fragment, port default; query diurutkan.
+  Dipakai untuk kunci cache HTML & URL hasil resolve Google News.
+- canonicalize(u): identitas artikel untuk dedup — clean_url ditambah:
+  host mobile/www/amp disatukan (m.detik.com/news/... → news.detik.com/...),
+  AMP cache (*.cdn.ampproject.org) dibuka, segmen/parameter AMP dibuang,
+  parameter paginasi (?page=all, ?single=1) dibuang, skema → https,
+  garis miring penutup dibuang. Hasilnya tidak selalu bisa diunduh.
+"""
+from functools import lru_cache
+from typing import Dict, FrozenSet, Tuple
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+TRACKING_PREFIXES = ("utm_", "mc_", "pk_", "itm_", "at_")
+# hanya parameter yang pasti pelacak: clean_url harus tetap bisa diunduh, jadi
+# nama generik yang bisa bermakna bagi server (ref, share, source) tidak dibuang global
+TRACKING_PARAMS = frozenset({
+    "gclid", "fbclid", "dclid", "msclkid", "yclid", "gbraid", "wbraid", "igshid",
+    "_ga", "_gl", "ref_src", "cmpid", "ocid", "s_cid",
+})
+HOST_PREFIXES = ("www.", "m.", "mobile.", "amp.")
+AMP_PARAMS = frozenset({"amp", "outputtype", "amp_js_v", "usqp"})
+# paginasi yang dibuang tanpa melihat nilai (per publisher); selain itu hanya page=all/1
+GENERIC_PAGINATION = frozenset({"page", "single", "showpage", "hal", "halaman"})
+
+# aturan khusus: parameter pelacak/paginasi tambahan, dan seksi yang di versi
+# mobile/AMP ditulis sebagai segmen path tapi di desktop sebagai subdomain
+PUBLISHER_RULES: Dict[str, Dict[str, FrozenSet[str]]] = {
+    "detik.com": {
+        "tracking": frozenset({"tag_from", "mtype", "dtm_source", "dtm_medium", "dtm_campaign"}),
+        "pagination": frozenset({"single", "page"}),
+        "sections": frozenset({
+            "news", "finance", "hot", "inet", "sport", "oto", "travel", "food", "health",
+            "wolipop", "edu", "hikmah", "jatim", "jateng", "jabar", "sumut", "sulsel", "bali",
+        }),
+    },
+    "kompas.com": {
+        "tracking": frozenset({"source", "lgn_method", "xid"}),
+        "pagination": frozenset({"page"}),
+        "sections": frozenset({
+            "nasional", "regional", "megapolitan", "money", "tekno", "otomotif", "bola",
+            "lifestyle", "health", "travel", "edukasi", "properti", "sains", "internasional",
+            "entertainment", "hype", "surabaya", "bandung", "medan", "yogyakarta",
+        }),
+    },
+    "tribunnews.com": {
+        "tracking": frozenset({"tribunamp", "_gl"}),
+        "pagination": frozenset({"page"}),
+    },
+    "okezone.com": {"pagination": frozenset({"page"})},
+    "sindonews.com": {"pagination": frozenset({"showpage"})},
+    "liputan6.com": {"tracking": frozenset({"medium", "campaign", "source"})},
+    "cnnindonesia.com": {"pagination": frozenset({"page"})},
+    "suara.com": {"pagination": frozenset({"page"})},
+}
+
+CACHE_SIZE = 65536
+
+
+def _rules(host: str) -> Dict[str, FrozenSet[str]]:
+    labels = host.split(".")
+    for i in range(len(labels) - 1):
+        rules = PUBLISHER_RULES.get(".".join(labels[i:]))
+        if rules is not None:
+            return rules
+    return {}
+
+
+def _is_tracking(key: str, rules: Dict[str, FrozenSet[str]]) -> bool:
+    k = key.lower()
+    return k in TRACKING_PARAMS or k.startswith(TRACKING_PREFIXES) or k in rules.get("tracking", ())
+
+
+def _host(netloc: str, scheme: str) -> str:
+    host = netloc.lower().rsplit("@", 1)[-1].rstrip(".")
+    if (scheme == "http" and host.endswith(":80")) or (scheme == "https" and host.endswith(":443")):
+        host = host.rsplit(":", 1)[0]
+    return host
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def clean_url(u: str) -> str:
+    """URL tanpa parameter pelacak & fragment (query terurut); tetap bisa diunduh."""
+    try:
+        p = urlsplit((u or "").strip())
+        if not p.netloc:
+            return u
+        scheme = p.scheme.lower() or "https"
+        host = _host(p.netloc, scheme)
+        rules = _rules(host)
+        q = sorted((k, v) for k, v in parse_qsl(p.query, keep_blank_values=True) if not _is_tracking(k, rules))
+        return urlunsplit((scheme, host, p.path or "/", urlencode(q), ""))
+    except Exception:
+        return u
+
+
+def _unwrap_amp_cache(host: str, path: str) -> Tuple[str, str]:
+    """news-google-com.cdn.ampproject.org/c/s/host/path → (host, /path)."""
+    parts = path.lstrip("/").split("/")
+    while parts and parts[0] in ("c", "v", "i", "s"):
+        parts = parts[1:]
+    if not parts or "." not in parts[0]:
+        return host, path
+    return parts[0].lower(), "/" + "/".join(parts[1:])
+
+
+@lru_cache(maxsize=CACHE_SIZE)
+def canonicalize(u: str) -> str:
+    """Identitas artikel (untuk dedup & kunci indeks): varian m./www./AMP/paginasi disatukan."""
+    try:
+        p = urlsplit(clean_url(u))
+        if not p.netloc:
+            return u
+        host, path = p.netloc, p.path
+        if host.endswith(".cdn.ampproject.org"):
+            host, path = _unwrap_amp_cache(host, path)
+        for prefix in HOST_PREFIXES:
+            if host.startswith(prefix) and host.count(".") > 1:
+                host = host[len(prefix):]
+                break
+        rules = _rules(host)
+
+        segs = [s for s in path.split("/") if s]
+        if segs and segs[0] == "amp":
+            segs = segs[1:]
+        if segs and segs[-1] in ("amp", "amp.html"):
+            segs = segs[:-1]
+        if segs and segs[-1].endswith(".amp"):
+            segs[-1] = segs[-1][:-4]
+        # m.detik.com/news/... & amp.kompas.com/nasional/... → subdomain seksi
+        if segs and host in PUBLISHER_RULES and segs[0] in rules.get("sections", ()):
+            host = f"{segs[0]}.{host}"
+            segs = segs[1:]
+
+        pagination = rules.get("pagination", frozenset())
+        q = []
+        for k, v in parse_qsl(p.query, keep_blank_values=True):
+            kl = k.lower()
+            if kl in AMP_PARAMS or kl in pagination:
+                continue
+            if kl in GENERIC_PAGINATION and v.lower() in ("all", "1", ""):
+                continue
+            q.append((k, v))
+        return urlunsplit(("https", host, "/" + "/".join(segs), urlencode(q), ""))
+    except Exception:
+        return u
@@ -1,60 +1,185 @@
 # backend/utils.py
+import asyncio
+import calendar
+import html as htmllib
+import os
 import re
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-from urllib.parse import urlparse, urlunparse, parse_qsl, urlencode
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
 from dateutil import parser as dtparser
 from zoneinfo import ZoneInfo
 
-def parse_entry_date(entry):
-    candidates = [
-        getattr(entry, "published", None),
-        getattr(entry, "updated", None),
-        entry.get("published") if isinstance(entry, dict) else None,
-        entry.get("updated") if isinstance(entry, dict) else None,
-    ]
-    for c in candidates:
-        if not c: continue
-        try:
-            dt = dtparser.parse(c)
-            if dt.tzinfo:
-                dt = dt.astimezone(ZoneInfo("Asia/Jakarta")).replace(tzinfo=None)
-            return dt
-        except Exception:
-            pass
-    return None
+from unidecode import unidecode
 
-def is_in_date_range_str(date_str, start_date, end_date) -> bool:
-    if not (start_date or end_date):
-        return True
+from backend.urlcanon import canonicalize, clean_url  # noqa: F401 (re-export)
+
+# direktori cache lokal (feed, indeks, dll) — bisa dioverride via env
+CACHE_DIR = os.getenv(
+    "NEWS_CACHE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache"),
+)
+
+_WS_RE = re.compile(r"\s+")
+
+def cache_dir(*parts: str) -> str:
+    """Path subdirektori di CACHE_DIR (dibuat bila belum ada)."""
+    path = os.path.join(CACHE_DIR, *parts)
+    os.makedirs(path, exist_ok=True)
+    return path
+
+def open_db(name: str = "news.db") -> sqlite3.Connection:
+    """Koneksi SQLite (WAL) di CACHE_DIR, dipakai bersama indeks/poller."""
+    conn = sqlite3.connect(os.path.join(cache_dir(), name), timeout=30, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
+
+def run_async(coro):
+    """Jalankan coroutine dari kode sinkron (aman juga bila sudah ada event loop)."""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    with ThreadPoolExecutor(max_workers=1) as ex:
+        return ex.submit(asyncio.run, coro).result()
+
+def clean_html_desc(text: str) -> str:
+    """Remove HTML tags dan decode HTML entities dari description"""
+    if not text:
+        return ""
+    
+    # 1. Decode HTML entities (&nbsp;, &amp;, dll)
+    text = htmllib.unescape(text)
+    
+    # 2. Remove semua HTML tags
+    text = re.sub(r'<[^>]+>', '', text)
+    
+    # 3. Remove extra whitespace
+    text = re.sub(r'\s+', ' ', text).strip()
+    
+    return text
+
+WIB = ZoneInfo("Asia/Jakarta")
+
+@lru_cache(maxsize=8192)
+def parse_date_ts(date_str: str) -> Optional[float]:
+    """String tanggal → epoch (memoized). Tanggal tanpa zona dianggap WIB."""
     if not date_str:
-        return False
+        return None
     try:
         dt = dtparser.parse(date_str)
-        if dt.tzinfo:
-            dt = dt.astimezone(ZoneInfo("Asia/Jakarta")).replace(tzinfo=None)
-        d = dt.date()
-        if start_date and d < start_date: return False
-        if end_date and d > end_date: return False
-        return True
     except Exception:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=WIB)
+    return dt.timestamp()
+
+def entry_timestamp(entry) -> Optional[float]:
+    """
+    Timestamp epoch satu entri feed, diparse sekali.
+    Jalur cepat: struct *_parsed (UTC) dari feedparser; fallback: string published/updated.
+    """
+    get = entry.get if isinstance(entry, dict) else (lambda k: getattr(entry, k, None))
+    for key in ("published_parsed", "updated_parsed"):
+        st_time = get(key)
+        if st_time:
+            try:
+                return float(calendar.timegm(st_time))
+            except Exception:
+                pass
+    for key in ("published", "updated"):
+        ts = parse_date_ts(get(key))
+        if ts is not None:
+            return ts
+    return None
+
+def ts_to_wib(ts: Optional[float]) -> Optional[datetime]:
+    """Epoch → datetime naive WIB."""
+    if ts is None:
+        return None
+    return datetime.fromtimestamp(ts, WIB).replace(tzinfo=None)
+
+def ts_in_date_range(ts: Optional[float], start_date, end_date) -> bool:
+    """Tanggal WIB dari ts dalam [start_date, end_date] (inklusif); tanpa ts → gagal bila filter aktif."""
+    if not (start_date or end_date):
+        return True
+    if ts is None:
         return False
+    d = ts_to_wib(ts).date()
+    if start_date and d < start_date: return False
+    if end_date and d > end_date: return False
+    return True
+
+def parse_entry_date(entry):
+    return ts_to_wib(entry_timestamp(entry))
+
+def is_in_date_range_str(date_str, start_date, end_date) -> bool:
+    return ts_in_date_range(parse_date_ts(date_str), start_date, end_date)
+
+def normalize_text(text: str) -> str:
+    """Normalisasi untuk pencocokan: transliterasi diakritik, lowercase, rapikan spasi."""
+    if not text:
+        return ""
+    if not text.isascii():
+        text = unidecode(text)
+    return _WS_RE.sub(" ", text.lower()).strip()
+
+class KeywordMatcher:
+    """
+    Matcher multi-keyword terkompilasi (satu regex gabungan, sekali jalan per teks).
+    - batas kata: "BI" tidak lagi cocok dengan "bisnis"
+    - normalisasi via normalize_text (case + diakritik)
+    - keyword yang overlap tetap terdeteksi (lookahead + prefix implisit)
+    """
+
+    def __init__(self, keywords: List[str]):
+        self._by_norm: Dict[str, List[str]] = {}
+        for kw in keywords:
+            k = normalize_text(kw)
+            if k:
+                self._by_norm.setdefault(k, []).append(kw)
+        self._order = {kw: i for i, kw in enumerate(keywords)}
+
+        norms = sorted(self._by_norm, key=len, reverse=True)
+        # "bi rate" cocok → "bi" juga cocok (alternatif terpanjang menang di posisi yang sama)
+        self._implied = {
+            k: [j for j in norms if j != k and k.startswith(j) and not k[len(j)].isalnum()]
+            for k in norms
+        }
+        alts = "|".join(r"\s+".join(map(re.escape, k.split(" "))) for k in norms)
+        self._re = re.compile(rf"(?<!\w)(?=({alts})(?!\w))") if norms else None
+
+    def find(self, *texts: str) -> List[str]:
+        """Keyword (bentuk asli, urut input) yang muncul di salah satu teks."""
+        if self._re is None:
+            return []
+        text = normalize_text(" \n ".join(t for t in texts if t))
+        found = set()
+        for m in self._re.finditer(text):
+            k = _WS_RE.sub(" ", m.group(1))
+            if k in found:
+                continue
+            found.add(k)
+            found.update(self._implied.get(k, ()))
+            if len(found) == len(self._by_norm):
+                break
+        hits = [kw for k in found for kw in self._by_norm.get(k, ())]
+        return sorted(hits, key=self._order.__getitem__)
+
+@lru_cache(maxsize=256)
+def _compile_keywords(keywords: Tuple[str, ...]) -> KeywordMatcher:
+    return KeywordMatcher(list(keywords))
+
+def compile_keywords(keywords) -> KeywordMatcher:
+    """Matcher untuk satu query (di-cache per tuple keyword)."""
+    if isinstance(keywords, KeywordMatcher):
+        return keywords
+    return _compile_keywords(tuple(keywords))
 
 def matches_keyword_multi(entry, keywords):
-    title = (getattr(entry, "title", "") or "").lower()
-    summary = (getattr(entry, "summary", "") or "").lower()
-    hits = []
-    for kw in keywords:
-        k = kw.strip().lower()
-        if k and (k in title or k in summary):
-            hits.append(kw)
-    return hits
-
-def canonicalize(u: str) -> str:
-    try:
-        p = urlparse(u)
-        q = [(k,v) for (k,v) in parse_qsl(p.query, keep_blank_values=True)
-             if not k.lower().startswith(("utm_","gclid","fbclid"))]
-        path = p.path.replace("/amp", "").replace("/amp/", "/")
-        return urlunparse((p.scheme, p.netloc, path, "", urlencode(q), ""))
-    except Exception:
-        return u
+    """Keyword yang muncul di title/summary entri; keywords = list atau KeywordMatcher."""
+    matcher = compile_keywords(keywords)
+    return matcher.find(getattr(entry, "title", "") or "", getattr(entry, "summary", "") or "")
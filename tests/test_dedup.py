@@ -0,0 +1,75 @@
+# tests/test_dedup.py
+import random
+
+import numpy as np
+import pytest
+
+from backend.dedup import NUM_PERM, cluster_near_duplicates, cluster_representatives, minhash
+
+_rng = random.Random(7)
+_VOCAB = [f"kata{i}" for i in range(5000)]
+
+
+def _article(n_words: int = 300) -> str:
+    return " ".join(_rng.choice(_VOCAB) for _ in range(n_words))
+
+
+BASE = [_article() for _ in range(3)]
+
+
+def _republished(text: str) -> str:
+    """Salinan media lain: dateline + footer + beberapa kata diubah."""
+    words = text.split()
+    for i in (50, 150, 250):
+        words[i] = "diubah"
+    return "JAKARTA, KOMPAS.com - " + " ".join(words) + " Baca berita selengkapnya di aplikasi kami."
+
+
+def test_minhash_shape_and_determinism():
+    sig = minhash(BASE[0])
+    assert sig.shape == (NUM_PERM,) and sig.dtype == np.uint32
+    assert np.array_equal(sig, minhash(BASE[0]))
+
+
+def test_minhash_short_text_is_none():
+    assert minhash("terlalu pendek") is None
+
+
+def test_near_duplicates_share_cluster():
+    texts = [BASE[0], _republished(BASE[0]), BASE[1], _republished(BASE[1])]
+    ids = cluster_near_duplicates(texts)
+    assert ids[0] == ids[1]
+    assert ids[2] == ids[3]
+    assert ids[0] != ids[2]
+
+
+def test_unrelated_texts_stay_apart():
+    texts = [_article() for _ in range(20)]
+    assert cluster_near_duplicates(texts) == list(range(20))
+
+
+def test_ids_dense_in_order_of_first_appearance():
+    texts = [BASE[2], BASE[0], _republished(BASE[2]), "pendek", BASE[0]]
+    assert cluster_near_duplicates(texts) == [0, 1, 0, 2, 1]
+
+
+def test_short_and_empty_texts_are_singletons():
+    texts = ["", None, "pendek", "pendek"]
+    assert cluster_near_duplicates(texts) == [0, 1, 2, 3]
+
+
+def test_empty_input():
+    assert cluster_near_duplicates([]) == []
+
+
+@pytest.mark.parametrize("threshold,same", [(0.5, True), (1.0, False)])
+def test_threshold_controls_merge(threshold, same):
+    ids = cluster_near_duplicates([BASE[0], _republished(BASE[0])], threshold=threshold)
+    assert (ids[0] == ids[1]) is same
+
+
+def test_representative_is_longest_member():
+    texts = [BASE[0], _republished(BASE[0]), BASE[1]]
+    ids = cluster_near_duplicates(texts)
+    reps = cluster_representatives(texts, ids)
+    assert reps == {ids[0]: 1, ids[2]: 2}
@@ -0,0 +1,84 @@
+# tests/test_urlcanon.py
+import pytest
+
+from backend.urlcanon import canonicalize, clean_url
+
+# varian URL yang harus dianggap artikel yang sama: (varian, bentuk lain)
+SAME_ARTICLE = [
+    # host mobile / www / amp
+    ("https://m.tribunnews.com/nasional/2024/01/01/judul", "https://www.tribunnews.com/nasional/2024/01/01/judul"),
+    ("https://www.antaranews.com/berita/123/judul", "https://antaranews.com/berita/123/judul"),
+    ("https://amp.suara.com/news/2024/01/01/judul", "https://www.suara.com/news/2024/01/01/judul"),
+    # seksi di path versi mobile/AMP → subdomain di desktop
+    ("https://m.detik.com/news/berita/d-7000001/judul", "https://news.detik.com/berita/d-7000001/judul"),
+    ("https://amp.kompas.com/nasional/read/2024/01/01/123/judul", "https://nasional.kompas.com/read/2024/01/01/123/judul"),
+    # path AMP: awalan /amp, akhiran /amp, akhiran .amp
+    ("https://www.tribunnews.com/amp/nasional/2024/01/01/judul", "https://www.tribunnews.com/nasional/2024/01/01/judul"),
+    ("https://www.cnnindonesia.com/nasional/2024-123/judul/amp", "https://www.cnnindonesia.com/nasional/2024-123/judul"),
+    ("https://www.example.com/berita/judul.amp", "https://www.example.com/berita/judul"),
+    ("https://www.example.com/berita/judul?amp=1", "https://www.example.com/berita/judul"),
+    # AMP cache Google
+    ("https://news-google-com.cdn.ampproject.org/c/s/www.tribunnews.com/amp/nasional/2024/01/01/judul",
+     "https://www.tribunnews.com/nasional/2024/01/01/judul"),
+    # paginasi
+    ("https://nasional.kompas.com/read/2024/01/01/123/judul?page=all", "https://nasional.kompas.com/read/2024/01/01/123/judul"),
+    ("https://news.detik.com/berita/d-7000001/judul?single=1", "https://news.detik.com/berita/d-7000001/judul"),
+    ("https://www.tribunnews.com/nasional/2024/01/01/judul?page=2", "https://www.tribunnews.com/nasional/2024/01/01/judul"),
+    ("https://www.example.com/berita/judul?page=all", "https://www.example.com/berita/judul"),
+    # parameter pelacak, fragment, urutan query, skema, port default, garis miring penutup
+    ("https://www.example.com/a?utm_source=x&utm_medium=y&id=5", "https://www.example.com/a?id=5"),
+    ("https://www.example.com/a?fbclid=abc&gclid=def#komentar", "https://www.example.com/a"),
+    ("https://news.detik.com/berita/d-1/judul?tag_from=wp_nhl", "https://news.detik.com/berita/d-1/judul"),
+    ("https://www.example.com/a?b=2&a=1", "https://www.example.com/a?a=1&b=2"),
+    ("http://www.antaranews.com:80/berita/123/judul/", "https://antaranews.com/berita/123/judul"),
+]
+
+# harus tetap berbeda
+DIFFERENT_ARTICLE = [
+    ("https://news.detik.com/berita/d-7000001/judul", "https://news.detik.com/berita/d-7000002/judul-lain"),
+    ("https://news.detik.com/berita/d-1/judul", "https://finance.detik.com/berita/d-1/judul"),
+    ("https://www.example.com/berita/judul?page=2", "https://www.example.com/berita/judul"),  # tanpa aturan publisher
+    ("https://www.example.com/a?id=5", "https://www.example.com/a?id=6"),
+    ("https://www.example.com/amplop/judul", "https://www.example.com/judul"),  # bukan segmen "amp"
+    ("https://www.example.com/a", "https://www.example.org/a"),
+    ("https://news.google.com/rss/articles/CBMiAAA", "https://news.google.com/rss/articles/CBMiBBB"),
+]
+
+
+@pytest.mark.parametrize("a,b", SAME_ARTICLE)
+def test_variants_share_canonical_key(a, b):
+    assert canonicalize(a) == canonicalize(b)
+
+
+@pytest.mark.parametrize("a,b", DIFFERENT_ARTICLE)
+def test_distinct_articles_stay_distinct(a, b):
+    assert canonicalize(a) != canonicalize(b)
+
+
+@pytest.mark.parametrize("url,expected", [
+    ("https://m.detik.com/news/berita/d-1/judul?utm_source=x#a", "https://news.detik.com/berita/d-1/judul"),
+    ("https://news-google-com.cdn.ampproject.org/c/s/www.kompas.com/x", "https://kompas.com/x"),
+])
+def test_canonical_form(url, expected):
+    assert canonicalize(url) == expected
+
+
+@pytest.mark.parametrize("url,expected", [
+    # pelacak, fragment, port default dibuang; query diurutkan
+    ("https://www.example.com/a?utm_source=x&b=2&a=1&fbclid=z#top", "https://www.example.com/a?a=1&b=2"),
+    ("http://www.example.com:80/a", "http://www.example.com/a"),
+    # varian tetap utuh (URL harus tetap bisa diunduh apa adanya)
+    ("https://m.detik.com/news/berita/d-1/judul", "https://m.detik.com/news/berita/d-1/judul"),
+    ("https://www.tribunnews.com/amp/nasional/judul", "https://www.tribunnews.com/amp/nasional/judul"),
+    ("https://nasional.kompas.com/read/1/judul?page=all", "https://nasional.kompas.com/read/1/judul?page=all"),
+    # parameter generik yang bisa bermakna bagi server tidak dibuang
+    ("https://www.example.com/a?ref=home&share=1", "https://www.example.com/a?ref=home&share=1"),
+])
+def test_clean_url_stays_fetchable(url, expected):
+    assert clean_url(url) == expected
+
+
+@pytest.mark.parametrize("value", ["", "bukan url", "/relatif/saja"])
+def test_non_absolute_input_returned_unchanged(value):
+    assert canonicalize(value) == value
+    assert clean_url(value) == value